@@ -0,0 +1,67 @@
+import numpy as np
+
+def daily_medians(patients, ts, bg, n, start, days=21):
+    '''
+    Calculate the median blood glucose level of each patient in each hour of a range of days.
+
+    Parameters:
+    ----------------------------------
+    patients: np.ndarray.
+        Position of the patient of each reading, between 0 and n - 1.
+
+    ts: np.ndarray.
+        Timestamps of the readings.
+
+    bg: np.ndarray.
+        Blood glucose levels of the readings, non-negative, missing readings are not included in the medians.
+        The medians are calculated in single precision.
+
+    n: int.
+        Number of patients.
+
+    start: np.datetime64.
+        First day of the range.
+
+    days: int.
+        Number of days in the range, readings outside the range are ignored.
+
+    Returns:
+    ----------------------------------
+    medians: np.ndarray.
+        Medians, array with shape (n, days, 24), missing for the hours without non-missing readings.
+
+    readings: np.ndarray.
+        Number of readings, including the missing ones, array with shape (n, days, 24).
+
+    valid: np.ndarray.
+        Number of non-missing readings, array with shape (n, days, 24).
+    '''
+
+    dtype = bg.dtype
+
+    # Find the day and hour of each reading in the range.
+    hours = (ts.astype('datetime64[h]') - np.datetime64(start, 'h')).astype(np.int64)
+    inside = (hours >= 0) & (hours < days * 24)
+    cells = patients[inside] * days * 24 + hours[inside]
+    bg = bg[inside]
+
+    # Count the readings in each patient, day and hour.
+    readings = np.bincount(cells, minlength=n * days * 24)
+
+    # Sort the non-missing readings by patient, day, hour and blood glucose level with a single integer sort,
+    # the bit patterns of non-negative floats sort in the same order as their values.
+    valid = ~np.isnan(bg)
+    keys = cells[valid].astype(np.int64) << 32 | bg[valid].astype(np.float32).view(np.uint32)
+    keys.sort()
+    cells, bg = keys >> 32, (keys & 0xFFFFFFFF).astype(np.uint32).view(np.float32)
+
+    # Take the middle reading, or the average of the two middle readings, of each patient, day and hour.
+    counts = np.bincount(cells, minlength=n * days * 24)
+    present = np.flatnonzero(counts)
+    first = np.r_[0, np.cumsum(counts[present])[:-1]]
+    medians = np.full(n * days * 24, np.nan, dtype=dtype)
+    medians[present] = (bg[first + (counts[present] - 1) // 2] + bg[first + counts[present] // 2]) / 2
+
+    shape = (n, days, 24)
+
+    return medians.reshape(shape), readings.astype(np.uint32).reshape(shape), counts.astype(np.uint32).reshape(shape)
@@ -0,0 +1,128 @@
+import numpy as np
+
+# Edges of the blood glucose level bins (in mg/dL), readings outside the edges are counted in the first or last bin.
+BINS = np.arange(20., 402., 2.)
+
+def hourly_histograms(patients, ts, bg, n):
+    '''
+    Count the readings of each patient in each hour of the day and blood glucose level bin.
+
+    Parameters:
+    ----------------------------------
+    patients: np.ndarray.
+        Position of the patient of each reading, between 0 and n - 1.
+
+    ts: np.ndarray.
+        Timestamps of the readings.
+
+    bg: np.ndarray.
+        Blood glucose levels of the readings, missing readings are not counted.
+
+    n: int.
+        Number of patients.
+
+    Returns:
+    ----------------------------------
+    np.ndarray.
+        Histograms, array with shape (n, 24, len(BINS) - 1), the counts of the readings of the patient at
+        position "i" in hour of the day "h" are "histograms[i, h]".
+    '''
+
+    bins = len(BINS) - 1
+    valid = ~np.isnan(bg)
+
+    # Find the hour of the day and the bin of each reading.
+    hours = ts[valid].astype('datetime64[h]').astype(np.int64) % 24
+    levels = np.clip(np.searchsorted(BINS, bg[valid], side='right') - 1, 0, bins - 1)
+
+    # Count the readings in each patient, hour and bin.
+    counts = np.bincount((patients[valid] * 24 + hours) * bins + levels, minlength=n * 24 * bins)
+
+    return counts.astype(np.uint16).reshape(n, 24, bins)
+
+
+def daily_histograms(ts, bg, start, days=21):
+    '''
+    Count the readings in each hour of a range of days and blood glucose level bin.
+
+    Parameters:
+    ----------------------------------
+    ts: np.ndarray.
+        Timestamps of the readings.
+
+    bg: np.ndarray.
+        Blood glucose levels of the readings, missing readings are not counted.
+
+    start: np.datetime64.
+        First day of the range.
+
+    days: int.
+        Number of days in the range, readings outside the range are ignored.
+
+    Returns:
+    ----------------------------------
+    np.ndarray.
+        Histograms, array with shape (days, 24, len(BINS) - 1), the counts of the readings in hour "h" of
+        day "d" are "histograms[d, h]".
+    '''
+
+    bins = len(BINS) - 1
+
+    # Find the day and hour and the bin of each reading in the range.
+    hours = (ts.astype('datetime64[h]') - np.datetime64(start, 'h')).astype(np.int64)
+    inside = (hours >= 0) & (hours < days * 24) & ~np.isnan(bg)
+    levels = np.clip(np.searchsorted(BINS, bg[inside], side='right') - 1, 0, bins - 1)
+
+    # Count the readings in each day, hour and bin.
+    counts = np.bincount(hours[inside] * bins + levels, minlength=days * 24 * bins)
+
+    return counts.astype(np.uint32).reshape(days, 24, bins)
+
+
+def histogram_percentiles(histograms, q):
+    '''
+    Calculate the hourly percentiles of the blood glucose levels from the sum of a set of hourly histograms.
+    The readings within each bin are assumed to be evenly spread over the bin, so that each reading is exact up
+    to the bin width. The percentiles are interpolated between the two readings around them, each estimated within
+    its own bin, as in "pd.Series.quantile".
+
+    Parameters:
+    ----------------------------------
+    histograms: np.ndarray.
+        Hourly histograms, array with shape (hours, len(BINS) - 1), see "hourly_histograms" and "daily_histograms".
+
+    q: list of float.
+        Percentiles, between 0 and 1.
+
+    Returns:
+    ----------------------------------
+    np.ndarray.
+        Percentiles, array with shape (hours, len(q)), missing for the hours without readings.
+    '''
+
+    counts = histograms.astype(np.int64)
+    cumulative = np.cumsum(counts, axis=1)
+    totals = cumulative[:, -1:]
+
+    def order_statistics(j):
+
+        # Find the bin containing each order statistic, and place it within the bin at (j + 0.5) / count.
+        bins = np.array([np.searchsorted(c, x, side='right') for c, x in zip(cumulative, j)])
+        bins = np.minimum(bins, counts.shape[1] - 1)
+        before = np.take_along_axis(cumulative - counts, bins, axis=1)
+        inside = np.take_along_axis(counts, bins, axis=1)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return BINS[bins] + (j - before + 0.5) / inside * np.diff(BINS)[bins]
+
+    # Find the position of each percentile among the sorted readings of each hour, and the order statistics around it.
+    positions = np.asarray(q)[None, :] * np.maximum(totals - 1, 0)
+    lower = np.floor(positions)
+    upper = np.minimum(lower + 1, np.maximum(totals - 1, 0))
+
+    # Interpolate between the order statistics.
+    lower, upper, weights = order_statistics(lower), order_statistics(upper), positions - lower
+    with np.errstate(invalid='ignore'):
+        percentiles = lower + weights * (upper - lower)
+
+    return np.where(totals > 0, percentiles, np.nan)
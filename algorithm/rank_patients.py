@@ -1,9 +1,83 @@
 import pandas as pd
 import numpy as np
+from joblib import Parallel, delayed, cpu_count
 
-def preprocess_data(df):
+from algorithm.resample_data import resample_data, resampled_end
+
+# Priority rules, in decreasing order of priority. Each rule assigns the patients who satisfy all its
+# conditions to its priority group. Each condition is a (metric, operator, threshold) tuple, where the
+# metric is a column of the ranking data or 'in_range_change (%)', the change in time in range over the
+# most recent week with respect to the previous week.
+PRIORITY_RULES = [
+
+    # Group 1: High extreme lows.
+    # - time in extreme hypo was more than 1% over the most recent week
+    # - time worn was more than 50% over the most recent week
+    {'review': '(1) High extreme lows', 'conditions': [
+        ('extreme_hypo (%)', '>', 0.01),
+        ('device_worn (%)', '>', 0.5),
+    ]},
+
+    # Group 2: High lows.
+    # - time in hypo was more than 4% over the most recent week
+    # - time worn was more than 50% over the most recent week
+    {'review': '(2) High lows', 'conditions': [
+        ('hypo (%)', '>', 0.04),
+        ('device_worn (%)', '>', 0.5),
+    ]},
+
+    # Group 3: Large drop in TIR.
+    # - time in range decreased by more than 15% over the most recent week
+    # - time worn was more than 50% over the most recent week
+    {'review': '(3) Large drop in TIR', 'conditions': [
+        ('in_range_change (%)', '<', - 0.15),
+        ('device_worn (%)', '>', 0.5),
+    ]},
+
+    # Group 4: Low TIR.
+    # - time in range was less than 65% over the most recent week
+    # - time worn was more than 50% over the most recent week
+    {'review': '(4) Low TIR', 'conditions': [
+        ('in_range (%)', '<', 0.65),
+        ('device_worn (%)', '>', 0.5),
+    ]},
+
+    # Group 6: No alerts.
+    # - time in range didn't decrease by more than 15% over the most recent week
+    # - time in extreme hypo was at most 1% over the most recent week
+    # - time in hypo was at most 4% over the most recent week
+    # - time in range was at least 65% over the most recent week
+    # - time worn was at least 50% over the most recent week
+    {'review': '(6) No alerts', 'conditions': [
+        ('in_range_change (%)', '>=', - 0.15),
+        ('extreme_hypo (%)', '<=', 0.01),
+        ('hypo (%)', '<=', 0.04),
+        ('in_range (%)', '>=', 0.65),
+        ('device_worn (%)', '>=', 0.5),
+    ]},
+
+]
+
+# Group 5: Missing/insufficient data (default).
+DEFAULT_GROUP = '(5) Missing/insufficient data'
+
+# Comparison operators of the rule conditions.
+OPERATORS = {'<': np.less, '<=': np.less_equal, '>': np.greater, '>=': np.greater_equal}
+
+# Glucose ranges, in the order of their range codes. Missing readings (device not worn)
+# are assigned the code following the last range.
+RANGES = ['extreme_hypo', 'hypo', 'in_range', 'hyp', 'extreme_hyp']
+MISSING = len(RANGES)
+
+def preprocess_data(df, n_jobs=1):
     '''
-    Preprocess the patients' time series dataset.
+    Preprocess the patients' time series dataset. The readings, the weekly statistics and the
+    patients' ranks and priority groups are returned as separate tables, to be joined only when needed.
+
+    If more than one job is used, the patients are partitioned into shards of contiguous patient ids,
+    which are preprocessed in a process pool. The shards are passed to the workers as NumPy arrays,
+    which are memory-mapped, and returned as NumPy arrays. The patients are ranked and prioritized
+    once all the shards have been preprocessed. The output does not depend on the number of jobs.
 
     Parameters:
     ----------------------------------
@@ -20,6 +94,9 @@ def preprocess_data(df):
         'bg': float.
             Blood glucose level.
 
+    n_jobs: int.
+        Number of worker processes, -1 to use all the available cores.
+
     Returns:
     ----------------------------------
     df: pd.DataFrame.
@@ -38,23 +115,18 @@ def preprocess_data(df):
         'most_recent_week': float.
             1.0 if the timestamp falls within the most recent week, 0.0 otherwise.
 
-        'device_worn': float.
-            1.0 if the patient is wearing the device, 0.0 otherwise.
-
-        'extreme_hypo': float.
-            1.0 if the patient's blood glucose level is less than 54, 0.0 otherwise.
+        'bg_range': int.
+            Glucose range code, see "classify_readings".
 
-        'hypo': float.
-            1.0 if the patient's blood glucose level is between 54 and 70, 0.0 otherwise.
+    stats: pd.DataFrame.
+        Patients' weekly statistics.
+        Data frame with one row per patient and week, with the following columns:
 
-        'in_range': float.
-            1.0 if the patient's blood glucose level is between 70 and 180, 0.0 otherwise.
-
-        'hyp': float.
-            1.0 if the patient's blood glucose level is between 180 and 250, 0.0 otherwise.
+        'id': int.
+            Patient id.
 
-        'extreme_hyp': float.
-            1.0 if the patient's blood glucose level is greater than 250, 0.0 otherwise.
+        'most_recent_week': float.
+            1.0 for the most recent week, 0.0 for the previous week.
 
         'device_worn (%)': float.
             Percentage of time that the patient has worn the device over a given week.
@@ -76,6 +148,13 @@ def preprocess_data(df):
         
         'bg (avg)': float.
             Patient's average blood glucose level over a given week.
+
+    data: pd.DataFrame.
+        Patients' ranks and priority groups.
+        Data frame with one row per patient, with the following columns:
+
+        'id': int.
+            Patient id.
         
         'rank': int.
             Patient's rank.
@@ -90,58 +169,302 @@ def preprocess_data(df):
     # Infer the frequency of the time series (in minutes)
     freq = df.groupby(by='id')['ts'].diff().mode()[0].total_seconds() / 60
     
+    # Find the most recent timestamp, which defines the most recent week.
+    end = resampled_end(df, freq)
+    
+    # Preprocess the time series of all patients, or of each shard of patients in parallel.
+    if n_jobs == 1:
+        shards = [preprocess_shard(df['id'].values, df['ts'].values, df['bg'].values, freq, end)]
+    
+    else:
+        shards = Parallel(n_jobs=n_jobs)(delayed(preprocess_shard)(*x, freq, end) for x in split_data(df, n_jobs))
+    
+    # Concatenate the shards, these are sorted by patient id.
+    df = pd.DataFrame({x: np.concatenate([y[0][x] for y in shards]) for x in shards[0][0]})
+    stats = pd.DataFrame({x: np.concatenate([y[1][x] for y in shards]) for x in shards[0][1]})
+
+    # Prepare the data for ranking.
+    data = ranking_data(stats)
+
+    # Rank the patients by time in range over the most recent week.
+    data['rank'] = rank_patients(data)
+
+    # Assign the patients to priority groups.
+    data['review'] = prioritize_patients(data)
+
+    return df, stats, data[['id', 'rank', 'review']]
+
+
+def split_data(df, n_jobs):
+    '''
+    Partition the patients' time series dataset into shards of contiguous patient ids, with
+    approximately the same number of readings. Four shards are created for each job.
+
+    Parameters:
+    ----------------------------------
+    df: pd.DataFrame.
+        Patients' time series dataset, with columns 'id', 'ts' and 'bg'.
+
+    n_jobs: int.
+        Number of worker processes, -1 to use all the available cores.
+
+    Returns:
+    ----------------------------------
+    list of tuple.
+        Patient ids, timestamps and blood glucose levels of the readings in each shard.
+    '''
+
+    n = 4 * (cpu_count() if n_jobs == -1 else n_jobs)
+    ids = df['id'].values
+
+    # Assign the patients to the shards, cutting the cumulative number of readings into equal parts.
+    patients, counts = np.unique(ids, return_counts=True)
+    cuts = np.searchsorted(np.cumsum(counts), np.linspace(0, len(ids), n + 1)[1:-1])
+    boundaries = np.unique(patients[cuts])
+    shards = np.searchsorted(boundaries, ids, side='right').astype(np.uint16)
+
+    # Group the readings by shard.
+    order = np.argsort(shards, kind='stable')
+    offsets = np.r_[0, np.cumsum(np.bincount(shards, minlength=len(boundaries) + 1))]
+    ids, ts, bg = ids[order], df['ts'].values[order], df['bg'].values[order]
+
+    return [(ids[i:j], ts[i:j], bg[i:j]) for i, j in zip(offsets[:-1], offsets[1:]) if j > i]
+
+
+def preprocess_shard(ids, ts, bg, freq, end):
+    '''
+    Resample, classify and summarize the time series of a shard of patients.
+
+    Parameters:
+    ----------------------------------
+    ids: np.ndarray.
+        Patient ids.
+
+    ts: np.ndarray.
+        Timestamps.
+
+    bg: np.ndarray.
+        Blood glucose levels.
+
+    freq: float.
+        Frequency of the resampled time series (in minutes).
+
+    end: np.datetime64.
+        Most recent timestamp across all the patients.
+
+    Returns:
+    ----------------------------------
+    tuple of dict.
+        Arrays with the columns of the preprocessed time series and of the weekly statistics, see "preprocess_data".
+    '''
+
     # Resample all the time series at the same frequency.
-    df = df.set_index('ts').groupby(by='id')['bg'].resample(f'{freq}T').last().reset_index()
+    df = resample_data(pd.DataFrame({'id': ids, 'ts': ts, 'bg': bg}), freq)
     
     # Add flag for most recent week.
-    df['most_recent_week'] = np.where(df['ts'].max() - df['ts'] < pd.Timedelta(days=7), 1., 0.)
-    
-    # Add flag for device worn.
-    df['device_worn'] = np.where(pd.notna(df['bg']), 1., 0.)
+    df['most_recent_week'] = np.where(end - df['ts'].values < np.timedelta64(7, 'D'), 1., 0.)
     
-    # Add flags for extreme hypo, hypo, in range, hyp, extreme hyp.
-    df['extreme_hypo'] = np.where(df['bg'] < 54, 1., 0.)
-    df['hypo'] = np.where((df['bg'] >= 54) & (df['bg'] < 70), 1., 0.)
-    df['in_range'] = np.where((df['bg'] >= 70) & (df['bg'] <= 180), 1., 0.)
-    df['hyp'] = np.where((df['bg'] > 180) & (df['bg'] <= 250), 1., 0.)
-    df['extreme_hyp'] = np.where(df['bg'] > 250, 1., 0.)
-    df.loc[df['device_worn'] == 0., ['extreme_hypo', 'hypo', 'in_range', 'hyp', 'extreme_hyp']] = np.nan
+    # Classify the readings into extreme hypo, hypo, in range, hyp, extreme hyp or missing.
+    df['bg_range'] = classify_readings(df['bg'].values)
     
+    # Calculate the weekly statistics.
+    stats = weekly_statistics(df)
+
+    return {x: df[x].values for x in df.columns}, {x: stats[x].values for x in stats.columns}
+
+
+def classify_readings(bg):
+    '''
+    Classify the blood glucose levels into glucose ranges in a single pass.
+
+    Parameters:
+    ----------------------------------
+    bg: np.ndarray.
+        Blood glucose levels.
+
+    Returns:
+    ----------------------------------
+    np.ndarray.
+        Glucose range codes, 0 if the blood glucose level is less than 54 (extreme hypo), 1 if it is between 54
+        and 70 (hypo), 2 if it is between 70 and 180 (in range), 3 if it is between 180 and 250 (hyp), 4 if it is
+        greater than 250 (extreme hyp) and 5 if it is missing, i.e. the patient is not wearing the device.
+    '''
+
+    # Define the lower bounds of the ranges, 180 and 250 belong to the range below them, while
+    # missing values are sorted after infinity.
+    edges = np.array([54, 70, np.nextafter(180, np.inf), np.nextafter(250, np.inf), np.inf])
+
+    return np.searchsorted(edges, bg, side='right').astype(np.int8)
+
+
+def range_counts(codes, groups, n):
+    '''
+    Count the readings in each glucose range within each group.
+
+    Parameters:
+    ----------------------------------
+    codes: np.ndarray.
+        Glucose range codes, see "classify_readings".
+
+    groups: np.ndarray.
+        Group index of each reading, between 0 and n - 1.
+
+    n: int.
+        Number of groups.
+
+    Returns:
+    ----------------------------------
+    np.ndarray.
+        Array with shape (n, 6), the first five columns are the counts of readings in each
+        glucose range, the last column is the count of missing readings.
+    '''
+
+    return np.bincount(groups * (MISSING + 1) + codes, minlength=n * (MISSING + 1)).reshape(n, MISSING + 1)
+
+
+def range_percentages(counts):
+    '''
+    Derive the percentages of time worn and of time in each glucose range from the counts.
+
+    Parameters:
+    ----------------------------------
+    counts: np.ndarray.
+        Counts of readings in each glucose range, see "range_counts".
+
+    Returns:
+    ----------------------------------
+    pd.DataFrame.
+        Data frame with one row per group, with columns 'device_worn (%)', 'extreme_hypo (%)', 'hypo (%)',
+        'in_range (%)', 'hyp (%)' and 'extreme_hyp (%)', see "preprocess_data". The percentages of time in
+        each glucose range are calculated over the readings when the device is worn.
+    '''
+
+    total = counts.sum(axis=1)
+    worn = total - counts[:, MISSING]
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        data = pd.DataFrame(counts[:, :MISSING] / worn[:, None], columns=[x + ' (%)' for x in RANGES])
+        data.insert(0, 'device_worn (%)', worn / total)
+
+    return data
+
+
+def weekly_statistics(df):
+    '''
+    Calculate the weekly statistics of each patient.
+
+    Parameters:
+    ----------------------------------
+    df: pd.DataFrame.
+        Patients' time series dataset, with columns 'id', 'bg', 'most_recent_week' and 'bg_range', see "preprocess_data".
+
+    Returns:
+    ----------------------------------
+    stats: pd.DataFrame.
+        Data frame with one row per patient and week, with columns 'id', 'most_recent_week', 'device_worn (%)',
+        'extreme_hypo (%)', 'hypo (%)', 'in_range (%)', 'hyp (%)', 'extreme_hyp (%)' and 'bg (avg)', see "preprocess_data".
+    '''
+
+    # Index the patient-weeks.
+    keys, groups = np.unique(df['id'].values * 2 + df['most_recent_week'].values.astype(int), return_inverse=True)
+
+    # Count the readings in each glucose range over each patient-week.
+    counts = range_counts(df['bg_range'].values, groups, len(keys))
+
     # Calculate the weekly percentages of time worn, time in extreme hypo, time in hypo, time in range, time in hyp, time in extreme hyp.
-    stats = df.drop(labels=['ts', 'bg'], axis=1).groupby(by=['id', 'most_recent_week']).mean()
-    stats.columns = [x + ' (%)' for x in stats.columns]
-    
+    stats = range_percentages(counts)
+    stats.insert(0, 'id', keys // 2)
+    stats.insert(1, 'most_recent_week', (keys % 2).astype(float))
+
     # Calculate the weekly average blood glucose level.
-    stats = stats.join(df.groupby(by=['id', 'most_recent_week'])['bg'].mean())
-    stats = stats.rename(columns={'bg': 'bg (avg)'}).reset_index(drop=False)
+    with np.errstate(invalid='ignore'):
+        stats['bg (avg)'] = np.bincount(groups, weights=np.nan_to_num(df['bg'].values), minlength=len(keys)) / counts[:, :MISSING].sum(axis=1)
 
-    # Prepare the data for ranking.
-    data = pd.merge(
+    return stats
+
+
+def ranking_data(stats):
+    '''
+    Prepare the data for ranking and prioritizing the patients.
+
+    Parameters:
+    ----------------------------------
+    stats: pd.DataFrame.
+        Weekly statistics, see "weekly_statistics".
+
+    Returns:
+    ----------------------------------
+    data: pd.DataFrame.
+        Data frame with one row per patient, with the columns required by "prioritize_patients".
+    '''
+
+    return pd.merge(
         left=stats.loc[stats['most_recent_week'] == 0., ['id', 'in_range (%)']].rename(columns={'in_range (%)': 'in_range_previous_week (%)'}),
         right=stats.loc[stats['most_recent_week'] == 1., ['id', 'device_worn (%)', 'in_range (%)', 'hypo (%)', 'extreme_hypo (%)']],
         on='id',
         how='outer'
     ).fillna({'in_range_previous_week (%)': 0.})
 
-    # Rank the patients by time in range over the most recent week.
-    data['rank'] = data[['in_range (%)']].apply(tuple, axis=1).rank(method='dense', ascending=True, na_option='bottom').astype(int)
 
-    # Assign the patients to priority groups.
-    data['review'] = prioritize_patients(data)
+def rank_patients(data, by=['in_range (%)'], ascending=True, groupby=None):
+    '''
+    Rank the patients by one or more metrics with dense ranks. The patients are sorted lexicographically
+    by the metrics in the given order, missing values are ranked last irrespective of the direction,
+    and patients with the same values of all the metrics are assigned the same rank.
 
-    # Add the weekly statistics to the input data frame.
-    df = pd.merge(left=df, right=stats, on=['id', 'most_recent_week'])
-    
-    # Add the ranks and priority groups to the input data frame.
-    df = pd.merge(left=df, right=data[['id', 'rank', 'review']], on='id')
-    
-    return df
+    Parameters:
+    ----------------------------------
+    data: pd.DataFrame.
+        Data frame with one row per patient, with the metric columns.
 
+    by: list of str.
+        Metric columns, in order of precedence.
 
-def prioritize_patients(data):
+    ascending: bool or list of bool.
+        Whether to rank each metric in ascending or descending order.
+
+    groupby: str or None.
+        Column by which to group the patients, e.g. 'population', the ranks start from 1 within each group.
+
+    Returns:
+    ----------------------------------
+    rank: pd.Series.
+        Patients' dense ranks.
+    '''
+
+    if isinstance(ascending, bool):
+        ascending = [ascending] * len(by)
+
+    # Extract the sort keys, in order of precedence, negating the metrics ranked in descending order.
+    groups = pd.factorize(data[groupby])[0] if groupby is not None else np.zeros(len(data), dtype=int)
+    keys = [data[x].values.astype(float) * (1 if y else - 1) for x, y in zip(by, ascending)]
+
+    # Sort the patients lexicographically, missing values are sorted last.
+    order = np.lexsort(keys[::-1] + [groups])
+    groups = groups[order]
+    keys = [x[order] for x in keys]
+
+    # Start a new rank whenever any of the metrics changes, treating missing values as equal.
+    changed = np.zeros(len(data), dtype=bool)
+    for x in keys:
+        changed[1:] |= (x[1:] != x[:-1]) & ~(np.isnan(x[1:]) & np.isnan(x[:-1]))
+
+    # Restart the ranks at the beginning of each group.
+    start = np.r_[True, groups[1:] != groups[:-1]][:len(data)]
+    rank = np.cumsum(changed | start)
+    rank -= np.maximum.accumulate(np.where(start, rank, 0)) - 1
+
+    # Restore the original order of the patients.
+    output = np.empty(len(data), dtype=int)
+    output[order] = rank
+
+    return pd.Series(output, index=data.index)
+
+
+def prioritize_patients(data, rules=PRIORITY_RULES, default=DEFAULT_GROUP):
     '''
-    Assign the patients to priority groups. Priority groups are assigned in reverse
-    order so each patient gets the highest possible priority given their data.
+    Assign the patients to priority groups. Each patient is assigned to the highest
+    priority group whose rule is satisfied by the patient's data.
 
     Parameters:
     ----------------------------------
@@ -165,50 +488,74 @@ def prioritize_patients(data):
         
         'in_range_previous_week (%)': float.
             Percentage of time that the patient's blood glucose level has been between 70 and 180 over the previous week.
+
+    rules: list of dict.
+        Priority rules, see "PRIORITY_RULES".
+
+    default: str.
+        Priority group of the patients who do not satisfy any rule.
  
     Returns:
     ----------------------------------
     review: pd.Series.
         Patients priority groups.
     '''
-    
-    # Group 5: Missing/insufficient data (default).
-    review = pd.Series(data='(5) Missing/insufficient data', index=data.index)
-    
-    # Group 6: No alerts.
-    # - time in range didn't decrease by more than 15% over the most recent week
-    # - time in extreme hypo was at most 1% over the most recent week
-    # - time in hypo was at most 4% over the most recent week
-    # - time in range was at least 65% over the most recent week
-    # - time worn was at least 50% over the most recent week
-    review[(data['in_range (%)'] - data['in_range_previous_week (%)'] >= - 0.15) &
-           (data['extreme_hypo (%)'] <= 0.01) &
-           (data['hypo (%)'] <= 0.04) &
-           (data['in_range (%)'] >= 0.65) &
-           (data['device_worn (%)'] >= 0.5)] = '(6) No alerts'
-    
-    # Group 4: Low TIR.
-    # - time in range was less than 65% over the most recent week
-    # - time worn was more than 50% over the most recent week
-    review[(data['in_range (%)'] < 0.65) &
-           (data['device_worn (%)'] > 0.5)] = '(4) Low TIR'
-    
-    # Group 3: Large drop in TIR.
-    # - time in range decreased by more than 15% over the most recent week
-    # - time worn was more than 50% over the most recent week
-    review[(data['in_range (%)'] - data['in_range_previous_week (%)'] < - 0.15) &
-           (data['device_worn (%)'] > 0.5)] = '(3) Large drop in TIR'
-    
-    # Group 2: High lows.
-    # - time in hypo was more than 4% over the most recent week
-    # - time worn was more than 50% over the most recent week
-    review[(data['hypo (%)'] > 0.04) &
-           (data['device_worn (%)'] > 0.5)] = '(2) High lows'
-    
-    # Group 1: High extreme lows.
-    # - time in extreme hypo was more than 1% over the most recent week
-    # - time worn was more than 50% over the most recent week
-    review[((data['extreme_hypo (%)'] > 0.01) &
-            (data['device_worn (%)'] > 0.5))] = '(1) High extreme lows'
-    
+
+    return evaluate_rules(data, [rules], default)[0].rename(None)
+
+
+def evaluate_rules(data, rule_sets, default=DEFAULT_GROUP):
+    '''
+    Assign the patients to priority groups under several alternative rule sets at once, e.g. for tuning the
+    thresholds or for using different thresholds in different clinics. The conditions of all the rules of all
+    the rule sets are evaluated as one boolean matrix over the patients, and the highest priority group whose
+    rule is satisfied is selected with an argmax over the rules of each rule set.
+
+    Parameters:
+    ----------------------------------
+    data: pd.DataFrame.
+        Data frame with the columns required by "prioritize_patients".
+
+    rule_sets: list or dict.
+        Rule sets, each rule set is a list of rules as in "PRIORITY_RULES" and each rule must have at least one condition.
+
+    default: str.
+        Priority group of the patients who do not satisfy any rule.
+
+    Returns:
+    ----------------------------------
+    pd.DataFrame.
+        Data frame with the patients priority groups, with one row per patient and one column per rule set.
+    '''
+
+    names = list(rule_sets.keys()) if isinstance(rule_sets, dict) else list(range(len(rule_sets)))
+    rule_sets = list(rule_sets.values()) if isinstance(rule_sets, dict) else list(rule_sets)
+    rules = [rule for rule_set in rule_sets for rule in rule_set]
+    conditions = [condition for rule in rules for condition in rule['conditions']]
+
+    # Add the derived metrics.
+    data = data.assign(**{'in_range_change (%)': data['in_range (%)'] - data['in_range_previous_week (%)']})
+
+    # Evaluate all the conditions as one boolean matrix, missing values do not satisfy any condition.
+    values = data[[x[0] for x in conditions]].values.astype(float)
+    operators = np.array([x[1] for x in conditions])
+    thresholds = np.array([x[2] for x in conditions], dtype=float)
+    matrix = np.zeros(values.shape, dtype=bool)
+    for operator in np.unique(operators):
+        columns = operators == operator
+        matrix[:, columns] = OPERATORS[operator](values[:, columns], thresholds[columns])
+
+    # Combine the conditions of each rule.
+    starts = np.cumsum([0] + [len(rule['conditions']) for rule in rules])[:-1]
+    matches = np.logical_and.reduceat(matrix, starts, axis=1) if len(rules) else matrix
+
+    # Select the first satisfied rule of each rule set, or the default group if no rule is satisfied.
+    review = pd.DataFrame(index=data.index)
+    start = 0
+    for name, rule_set in zip(names, rule_sets):
+        groups = np.array([rule['review'] for rule in rule_set] + [default], dtype=object)
+        satisfied = np.c_[matches[:, start: start + len(rule_set)], np.ones(len(data), dtype=bool)]
+        review[name] = groups[np.argmax(satisfied, axis=1)]
+        start += len(rule_set)
+
     return review
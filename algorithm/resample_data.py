@@ -0,0 +1,121 @@
+import pandas as pd
+import numpy as np
+
+def resample_data(df, freq):
+    '''
+    Resample the patients' time series at a given frequency. This is equivalent to
+    df.set_index('ts').groupby(by='id')['bg'].resample(f'{freq}T').last().reset_index()
+    but the timestamps are converted to integer slot indices relative to the start of each
+    patient's time series, and the readings are scattered into a preallocated grid in one
+    vectorized pass. The last reading in each slot is kept, slots without readings are missing.
+
+    Parameters:
+    ----------------------------------
+    df: pd.DataFrame.
+        Patients' time series dataset.
+        Data frame with the following columns:
+
+        'id': int.
+            Patient id.
+
+        'ts': pd.datetime.
+            Timestamp.
+
+        'bg': float.
+            Blood glucose level.
+
+    freq: float.
+        Frequency of the resampled time series (in minutes).
+
+    Returns:
+    ----------------------------------
+    pd.DataFrame.
+        Resampled patients' time series dataset, sorted by patient id and timestamp.
+        Data frame with the same columns as the input data frame.
+    '''
+
+    # Define the slot and day lengths (in nanoseconds).
+    step = int(round(freq * 60 * 1e9))
+    day = 24 * 60 * 60 * 10 ** 9
+
+    # Sort the readings by patient id and timestamp, keeping the original order of ties,
+    # unless they are sorted already.
+    ids = df['id'].values
+    ts = df['ts'].values.astype('datetime64[ns]').view(np.int64)
+    bg = df['bg'].values.astype(float)
+    changes = np.diff(ids)
+    if not np.all((changes > 0) | ((changes == 0) & (np.diff(ts) >= 0))):
+        order = np.lexsort((ts, ids))
+        ids, ts, bg = ids[order], ts[order], bg[order]
+
+    # Find the first reading and the number of readings of each patient.
+    start = np.flatnonzero(np.diff(ids, prepend=ids[:1] - 1))
+    counts = np.diff(np.r_[start, len(ids)])
+
+    # Align the slots of each patient to midnight of the patient's first day, as pandas does.
+    origin = ts[start] // day * day
+
+    # Convert the timestamps to slot indices relative to the origin of each patient.
+    slots = (ts - np.repeat(origin, counts)) // step
+    first = slots[start]
+    lengths = slots[start + counts - 1] - first + 1
+
+    # Find the position of each reading in the resampled grid.
+    offsets = np.r_[0, np.cumsum(lengths)]
+    positions = np.repeat(offsets[:-1] - first, counts) + slots
+
+    # Scatter the readings into the grid, keeping the last non-missing reading in each slot.
+    valid = ~np.isnan(bg)
+    positions, bg = positions[valid], bg[valid]
+    last = np.diff(positions, append=positions[-1:] + 1) != 0
+    values = np.full(offsets[-1], np.nan)
+    values[positions[last]] = bg[last]
+
+    # Generate the resampled timestamps.
+    slots = np.arange(offsets[-1]) - np.repeat(offsets[:-1] - first, lengths)
+    ts = np.repeat(origin, lengths) + slots * step
+
+    return pd.DataFrame({
+        'id': np.repeat(ids[start], lengths),
+        'ts': ts.view('datetime64[ns]'),
+        'bg': values
+    })
+
+
+def resampled_end(df, freq):
+    '''
+    Find the most recent timestamp of the patients' time series after resampling them at a given
+    frequency, without resampling them, see "resample_data".
+
+    Parameters:
+    ----------------------------------
+    df: pd.DataFrame.
+        Patients' time series dataset, with columns 'id' and 'ts'.
+
+    freq: float.
+        Frequency of the resampled time series (in minutes).
+
+    Returns:
+    ----------------------------------
+    np.datetime64.
+        Most recent timestamp of the resampled time series.
+    '''
+
+    # Define the slot and day lengths (in nanoseconds).
+    step = int(round(freq * 60 * 1e9))
+    day = 24 * 60 * 60 * 10 ** 9
+
+    ids = df['id'].values
+    ts = df['ts'].values.astype('datetime64[ns]').view(np.int64)
+
+    # Find the patients with the most recent reading.
+    latest = ts.max()
+    candidates = np.unique(ids[ts == latest])
+
+    # Align the most recent reading to the slots of each of these patients, which start
+    # at midnight of the patient's first day.
+    mask = np.isin(ids, candidates)
+    origin = pd.Series(ts[mask]).groupby(ids[mask]).min().values // day * day
+    ends = origin + (latest - origin) // step * step
+
+    return ends.max().view('datetime64[ns]')
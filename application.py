@@ -1,25 +1,42 @@
 import dash
 import dash_html_components as html
-from dash.dependencies import Input, Output, State
+from dash.dependencies import Input, Output, State, ClientsideFunction
 from flask import Flask
 
 from layouts.bar_chart_layout import bar_chart_layout
 from layouts.table_layout import table_layout
 from layouts.line_chart_layout import line_chart_layout
 from layouts.calendar_chart_layout import calendar_chart_layout
+from layouts.calendar_grid_chart_layout import calendar_grid_chart_layout
 
-from callbacks.bar_chart_callbacks import update_bar_chart
 from callbacks.table_callbacks import update_table
 from callbacks.line_chart_callbacks import update_line_chart
 from callbacks.calendar_chart_callbacks import update_calendar_chart
+from callbacks.calendar_grid_chart_callbacks import update_calendar_grid_chart
+from callbacks.view_cache import ViewCache
+from callbacks.bar_chart_cache import BarChartCache
 
-# App data (sample).
-from data.sample_data import load_sample_data
-df = load_sample_data()
+# App data (sample), memory-mapped from the cache and shared by all the workers. The store is read-only here,
+# "PatientStore.update" would only update the calling worker's private copy.
+from data.sample_data import load_sample_store
+store = load_sample_store(compact=True)
 
 # App data (random).
 # from data.sample_data import generate_random_data
-# df = generate_random_data()
+# from data.patient_store import PatientStore
+# store = PatientStore(*generate_random_data(compact=True))
+
+# Cache of the patient views, shared by the callbacks of this worker.
+views = ViewCache(max_bytes=64 * 2 ** 20)
+
+# Bar charts for every combination of the filters, built in the background when enabled.
+bar_charts = BarChartCache(store, windows=[7], budget=1000, max_workers=2, page_size=50)
+precompute_bar_charts = False
+if precompute_bar_charts:
+    bar_charts.start()
+
+# Calendar chart drawn as a single figure, instead of one figure for each day.
+single_calendar_chart = True
 
 # App set-up.
 server = Flask(__name__)
@@ -44,7 +61,7 @@ app.layout = html.Div(
         # Bar chart.
         html.Div(
             children=bar_chart_layout(
-                populations=df['population'].sort_values().unique().tolist()
+                populations=store.populations()
             ),
             style={'margin': '1vw 0vw 0.5vw 0vw'}
         ),
@@ -63,7 +80,7 @@ app.layout = html.Div(
 
         # Calendar chart.
         html.Div(
-            children=calendar_chart_layout,
+            children=calendar_grid_chart_layout if single_calendar_chart else calendar_chart_layout,
             style={'margin': '1vw 0vw 1.5vw 0vw'}
         ),
 
@@ -71,10 +88,87 @@ app.layout = html.Div(
 )
 
 # App callbacks.
+filters = [
+    Input('population-checklist', 'value'),
+    Input('window-radio', 'value'),
+    Input('time-worn-less-than-75-checklist', 'value'),
+    Input('time-in-range-less-than-65-checklist', 'value'),
+    Input('time-below-70-greater-than-4-checklist', 'value'),
+    Input('time-below-54-greater-than-1-checklist', 'value'),
+]
+
 @app.callback(
-    [Output('bar-chart', 'figure'),
+    [Output('bar-chart-figure', 'data'),
      Output('bar-chart', 'style'),
-     Output('table-header', 'children'),
+     Output('bar-chart-page', 'data'),
+     Output('page-description', 'children')],
+    filters + [
+     Input('sort-dropdown', 'value'),
+     Input('page-size-dropdown', 'value'),
+     Input('previous-page-button', 'n_clicks'),
+     Input('next-page-button', 'n_clicks')],
+    [State('bar-chart', 'style'),
+     State('bar-chart-page', 'data')]
+)
+def update_bar_chart_callback(populations,
+                              window,
+                              time_worn_less_than_75,
+                              time_in_range_less_than_65,
+                              time_below_70_greater_than_4,
+                              time_below_54_greater_than_1,
+                              sort,
+                              page_size,
+                              previous_clicks,
+                              next_clicks,
+                              style,
+                              page):
+    
+    # Check which input has triggered the callback.
+    changed_id = [p['prop_id'] for p in dash.callback_context.triggered][0]
+    
+    # Move to the previous or next page, or go back to the first page if the filters or the sorting have changed.
+    if changed_id == 'previous-page-button.n_clicks':
+        page = max(page - 1, 0)
+    
+    elif changed_id == 'next-page-button.n_clicks':
+        page = page + 1
+    
+    else:
+        page = 0
+    
+    # Update the bar chart, looking it up among the materialized bar charts first.
+    return bar_charts.get(window,
+                          populations,
+                          time_worn_less_than_75,
+                          time_in_range_less_than_65,
+                          time_below_70_greater_than_4,
+                          time_below_54_greater_than_1,
+                          style,
+                          sort,
+                          page,
+                          page_size or None)
+
+
+# Select the patient whose bar has been clicked, or clear the selection when the bar chart is redrawn.
+app.clientside_callback(
+    ClientsideFunction(namespace='dashboard', function_name='select_patient'),
+    Output('selected-patient', 'data'),
+    [Input('bar-chart', 'clickData'),
+     Input('bar-chart-figure', 'data')],
+    [State('selected-patient', 'data')]
+)
+
+# Highlight the selected patient in the browser, without sending the bar chart to the server.
+app.clientside_callback(
+    ClientsideFunction(namespace='dashboard', function_name='highlight_patient'),
+    Output('bar-chart', 'figure'),
+    [Input('bar-chart-figure', 'data'),
+     Input('selected-patient', 'data')]
+)
+
+
+@app.callback(
+    [Output('table-header', 'children'),
      Output('avg-glucose-table-cell', 'children'),
      Output('very-low-table-cell', 'children'),
      Output('low-table-cell', 'children'),
@@ -83,85 +177,47 @@ app.layout = html.Div(
      Output('very-high-table-cell', 'children'),
      Output('coefficient-variation-table-cell', 'children'),
      Output('standard-deviation-table-cell', 'children'),
-     Output('time-active-table-cell', 'children'),
-     Output('line-chart-header', 'children'),
-     Output('line-chart', 'figure'),
-     Output('monday-week-1', 'figure'),
-     Output('tuesday-week-1', 'figure'),
-     Output('wednesday-week-1', 'figure'),
-     Output('thursday-week-1', 'figure'),
-     Output('friday-week-1', 'figure'),
-     Output('saturday-week-1', 'figure'),
-     Output('sunday-week-1', 'figure'),
-     Output('monday-week-2', 'figure'),
-     Output('tuesday-week-2', 'figure'),
-     Output('wednesday-week-2', 'figure'),
-     Output('thursday-week-2', 'figure'),
-     Output('friday-week-2', 'figure'),
-     Output('saturday-week-2', 'figure'),
-     Output('sunday-week-2', 'figure'),
-     Output('monday-week-3', 'figure'),
-     Output('tuesday-week-3', 'figure'),
-     Output('wednesday-week-3', 'figure'),
-     Output('thursday-week-3', 'figure'),
-     Output('friday-week-3', 'figure'),
-     Output('saturday-week-3', 'figure'),
-     Output('sunday-week-3', 'figure')],
-    [Input('population-checklist', 'value'),
-     Input('time-worn-less-than-75-checklist', 'value'),
-     Input('time-in-range-less-than-65-checklist', 'value'),
-     Input('time-below-70-greater-than-4-checklist', 'value'),
-     Input('time-below-54-greater-than-1-checklist', 'value'),
-     Input('bar-chart', 'clickData')],
-    [State('bar-chart', 'figure'),
-     State('bar-chart', 'style')]
+     Output('time-active-table-cell', 'children')],
+    [Input('selected-patient', 'data')]
 )
-def update_dashboard(populations,
-                     time_worn_less_than_75,
-                     time_in_range_less_than_65,
-                     time_below_70_greater_than_4,
-                     time_below_54_greater_than_1,
-                     click_data,
-                     figure,
-                     style):
+def update_table_callback(id):
     
-    # Create a copy of the patients' dataset.
-    data = df.copy()
-    
-    # Check which input has triggered the callback.
-    changed_id = [p['prop_id'] for p in dash.callback_context.triggered][0]
+    # Update the table for the selected patient, or for all patients.
+    return views.get(('table', id), (store.loaded, store.version), lambda: update_table(store, id))
+
+
+@app.callback(
+    [Output('line-chart-header', 'children'),
+     Output('line-chart', 'figure')],
+    [Input('selected-patient', 'data')]
+)
+def update_line_chart_callback(id):
     
-    # Update the bar chart.
-    outputs = update_bar_chart(data,
-                               populations,
-                               time_worn_less_than_75,
-                               time_in_range_less_than_65,
-                               time_below_70_greater_than_4,
-                               time_below_54_greater_than_1,
-                               click_data,
-                               figure,
-                               style,
-                               changed_id)
-
-    # If a patient has been selected, use only the data for this patient.
-    if changed_id == 'bar-chart.clickData':
-        
-        # Extract the id of the selected patient.
-        id = click_data['points'][0]['customdata']
+    # Update the line chart for the selected patient, or for all patients.
+    return views.get(('line', id), (store.loaded, store.version), lambda: update_line_chart(store, id))
+
+
+if single_calendar_chart:
+
+    @app.callback(
+        Output('calendar-grid-chart', 'figure'),
+        [Input('selected-patient', 'data')]
+    )
+    def update_calendar_chart_callback(id):
         
-        # Extract the data for the selected patient.
-        data = data[data['id'] == id].reset_index(drop=True)
-    
-    # Update the table.
-    outputs.extend(update_table(data))
+        # Update the calendar chart for the selected patient, or for all patients.
+        return views.get(('calendar-grid', id), (store.loaded, store.version), lambda: update_calendar_grid_chart(store, id))
 
-    # Update the line chart.
-    outputs.extend(update_line_chart(data))
+else:
 
-    # Update the calendar chart.
-    outputs.extend(update_calendar_chart(data))
-    
-    return outputs
+    @app.callback(
+        [Output(f'{day}-week-{week}', 'figure') for week in [1, 2, 3] for day in ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']],
+        [Input('selected-patient', 'data')]
+    )
+    def update_calendar_chart_callback(id):
+        
+        # Update the calendar chart for the selected patient, or for all patients.
+        return views.get(('calendar', id), (store.loaded, store.version), lambda: update_calendar_chart(store, id))
 
 
 # Run the app.
@@ -0,0 +1,36 @@
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+
+    dashboard: {
+
+        // Select the patient whose bar has been clicked, or clear the selection if the bar chart has been redrawn.
+        // The patient id is the first item of the custom data of the bars.
+        select_patient: function(click_data, figure, selected) {
+
+            var triggered = window.dash_clientside.callback_context.triggered.map(function(x) { return x.prop_id; });
+            var id = triggered.indexOf('bar-chart.clickData') !== -1 && click_data ? click_data.points[0].customdata[0] : null;
+
+            return id !== selected ? id : window.dash_clientside.no_update;
+        },
+
+        // Highlight the bars of the selected patient by lowering the opacity of the other bars.
+        highlight_patient: function(figure, id) {
+
+            if (!figure || !figure.data) {
+                return window.dash_clientside.no_update;
+            }
+
+            return Object.assign({}, figure, {
+                data: figure.data.map(function(trace) {
+
+                    if (!trace.customdata) {
+                        return trace;
+                    }
+
+                    var opacity = id === null || id === undefined ? 1 : trace.customdata.map(function(x) { return x[0] === id ? 1 : 0.5; });
+
+                    return Object.assign({}, trace, {marker: Object.assign({}, trace.marker, {opacity: opacity})});
+                })
+            });
+        }
+    }
+});
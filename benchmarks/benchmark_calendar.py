@@ -0,0 +1,42 @@
+import sys
+import json
+import time
+import argparse
+from plotly.utils import PlotlyJSONEncoder
+
+sys.path.append('.')
+from data.sample_data import load_sample_store
+from callbacks.calendar_chart_callbacks import update_calendar_chart
+from callbacks.calendar_grid_chart_callbacks import update_calendar_grid_chart
+
+def benchmark(name, update, store, ids, repeats):
+    '''
+    Time a calendar renderer for the given patients, including the JSON serialization sent to the browser,
+    and measure the size of the payload and the number of figures and traces drawn by the browser.
+    '''
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for id in ids:
+            outputs = update(store, id)
+            payload = json.dumps(outputs, cls=PlotlyJSONEncoder)
+    elapsed = (time.perf_counter() - start) / repeats / len(ids)
+
+    figures = outputs if isinstance(outputs, list) else [outputs]
+    traces = sum(len(figure['data']) for figure in figures)
+
+    print(f'{name:>8}: {elapsed * 1000:6.1f}ms, payload {len(payload) / 1024:6.1f}KB, {len(figures):2d} figures, {traces:2d} traces')
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description='Benchmark the calendar chart, one figure for each day against a single figure.')
+    parser.add_argument('--patients', type=int, default=10)
+    parser.add_argument('--repeats', type=int, default=5)
+    args = parser.parse_args()
+
+    store = load_sample_store(compact=True)
+    ids = [None] + list(store.ids[:args.patients])
+
+    benchmark('21 days', update_calendar_chart, store, ids, args.repeats)
+    benchmark('grid', update_calendar_grid_chart, store, ids, args.repeats)
@@ -0,0 +1,87 @@
+import sys
+import json
+import time
+import argparse
+import pandas as pd
+import numpy as np
+from plotly.utils import PlotlyJSONEncoder
+
+sys.path.append('.')
+sys.path.append('benchmarks')
+from visualizations.bar_chart import bar_chart
+from visualizations.line_chart import line_chart
+from visualizations.calendar_chart import calendar_chart
+from previous_figures import previous_bar_chart, previous_line_chart, previous_calendar_chart
+
+def generate_patients(num):
+    '''
+    Generate random bar chart data for a given number of patients.
+    '''
+
+    return pd.DataFrame({
+        'id': np.arange(num),
+        'name': [f'Patient {i}' for i in range(num)],
+        'rank': np.arange(1, num + 1),
+        'review': np.random.choice(['(1) Poor control', '(2) High lows', '(6) No alerts'], size=num),
+        'device_worn (%)': np.random.uniform(size=num),
+        'bg (avg)': np.random.uniform(low=60, high=250, size=num),
+        'in_range (%)': np.random.uniform(size=num),
+        'hypo (%)': np.random.uniform(high=0.1, size=num),
+        'extreme_hypo (%)': np.random.uniform(high=0.03, size=num),
+    })
+
+
+def generate_percentiles():
+    '''
+    Generate random line chart data, the hourly percentiles of the blood glucose levels.
+    '''
+
+    data = pd.DataFrame(np.sort(np.random.uniform(low=60, high=250, size=(24, 5)), axis=1), columns=['10%', '25% - IQR', '50% - Median', '75% - IQR', '90%'])
+    data['hour'] = pd.to_datetime(np.arange(24), format='%H').strftime('%I %p')
+
+    return data
+
+
+def generate_day():
+    '''
+    Generate random calendar chart data, the hourly medians of the blood glucose levels on a given day.
+    '''
+
+    return pd.DataFrame({
+        'day': 1,
+        'hour': pd.to_datetime(np.arange(24), format='%H').strftime('%I %p'),
+        'bg': np.random.uniform(low=60, high=250, size=24),
+    })
+
+
+def benchmark(name, previous, template, data, repeats):
+    '''
+    Time the previous figure builder, which built the figure with plotly objects on every call, against the
+    template-based figure builder, including the JSON serialization sent to the browser.
+    '''
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        json.dumps(previous(data), cls=PlotlyJSONEncoder)
+    before = (time.perf_counter() - start) / repeats
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        json.dumps(template(data), cls=PlotlyJSONEncoder)
+    after = (time.perf_counter() - start) / repeats
+
+    print(f'{name:>25}: previous {before * 1000:8.1f}ms, template {after * 1000:8.1f}ms, speed-up {before / after:6.1f}x')
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description='Benchmark the template-based figures against the previous figure builders.')
+    parser.add_argument('--patients', type=int, nargs='+', default=[100, 1000, 10000])
+    parser.add_argument('--repeats', type=int, default=5)
+    args = parser.parse_args()
+
+    for num in args.patients:
+        benchmark(f'bar chart {num:,d} patients', previous_bar_chart, bar_chart, generate_patients(num), args.repeats)
+
+    benchmark('line chart', previous_line_chart, line_chart, generate_percentiles(), args.repeats)
+    benchmark('calendar chart', previous_calendar_chart, calendar_chart, generate_day(), args.repeats)
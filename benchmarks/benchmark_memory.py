@@ -0,0 +1,10 @@
+import sys
+
+sys.path.append('.')
+from data.sample_data import load_sample_data
+from data.compact_data import memory_report
+
+if __name__ == '__main__':
+
+    # Print the bytes per reading of the sample dataset before and after the conversion to compact dtypes.
+    print(memory_report(*load_sample_data()).round(2).to_string())
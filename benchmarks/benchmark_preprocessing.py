@@ -0,0 +1,43 @@
+import sys
+import time
+import argparse
+import pandas as pd
+
+sys.path.append('.')
+from algorithm.rank_patients import preprocess_data
+from benchmarks.benchmark_resampling import generate_readings
+
+def benchmark(num, days, jobs):
+    '''
+    Time the preprocessing on a given number of patients with different numbers of jobs,
+    and check that the parallel output is the same as the serial output.
+    '''
+
+    df = generate_readings(num, days)
+
+    start = time.perf_counter()
+    expected = preprocess_data(df.copy(), n_jobs=1)
+    serial = time.perf_counter() - start
+    print(f'{num:>7,d} patients, 1 job: {serial:8.2f}s')
+
+    for n_jobs in jobs:
+        start = time.perf_counter()
+        output = preprocess_data(df.copy(), n_jobs=n_jobs)
+        parallel = time.perf_counter() - start
+
+        for x, y in zip(output, expected):
+            pd.testing.assert_frame_equal(x, y)
+
+        print(f'{num:>7,d} patients, {n_jobs} jobs: {parallel:8.2f}s, speed-up {serial / parallel:6.1f}x')
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description='Benchmark the serial and parallel preprocessing of the patients\' time series.')
+    parser.add_argument('--patients', type=int, nargs='+', default=[1000, 10000])
+    parser.add_argument('--days', type=int, default=14)
+    parser.add_argument('--jobs', type=int, nargs='+', default=[2, 4, -1])
+    args = parser.parse_args()
+
+    for num in args.patients:
+        benchmark(num, args.days, args.jobs)
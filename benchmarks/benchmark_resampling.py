@@ -0,0 +1,84 @@
+import sys
+import time
+import argparse
+import pandas as pd
+import numpy as np
+
+sys.path.append('.')
+from algorithm.resample_data import resample_data
+
+def generate_readings(num, days=14, freq=5, missing=0.1):
+    '''
+    Generate random blood glucose level time series for multiple patients, with jittered
+    timestamps and randomly dropped readings.
+
+    Parameters:
+    ----------------------------------
+    num: int.
+        Number of patients.
+
+    days: int.
+        Length of the time series (in days).
+
+    freq: int.
+        Frequency of the time series (in minutes).
+
+    missing: float.
+        Fraction of readings to drop.
+
+    Returns:
+    ----------------------------------
+    pd.DataFrame.
+        Data frame with columns 'id', 'ts' and 'bg'.
+    '''
+
+    # Generate the regular timestamps.
+    steps = days * 24 * 60 // freq
+    end = pd.Timestamp.today().normalize()
+    ts = pd.date_range(end=end - pd.Timedelta(minutes=freq), periods=steps, freq=f'{freq}T').values
+
+    # Generate the readings.
+    ids = np.repeat(np.arange(num), steps)
+    ts = np.tile(ts, num) + np.random.randint(0, 60, size=num * steps).astype('timedelta64[s]')
+    bg = np.random.uniform(low=40, high=300, size=num * steps)
+
+    # Drop some readings.
+    keep = np.random.uniform(size=num * steps) >= missing
+
+    return pd.DataFrame({'id': ids[keep], 'ts': ts[keep], 'bg': bg[keep]})
+
+
+def benchmark(num, days, pandas):
+    '''
+    Time the pandas and vectorized resampling on a given number of patients, and check
+    that the two return the same output.
+    '''
+
+    df = generate_readings(num, days)
+
+    start = time.perf_counter()
+    output = resample_data(df, 5.0)
+    vectorized = time.perf_counter() - start
+
+    if pandas:
+        start = time.perf_counter()
+        expected = df.set_index('ts').groupby(by='id')['bg'].resample('5.0T').last().reset_index()
+        reference = time.perf_counter() - start
+        pd.testing.assert_frame_equal(output, expected)
+        print(f'{num:>7,d} patients: pandas {reference:8.2f}s, vectorized {vectorized:8.2f}s, speed-up {reference / vectorized:6.1f}x')
+
+    else:
+        print(f'{num:>7,d} patients: pandas      n/a, vectorized {vectorized:8.2f}s')
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description='Benchmark the resampling of the patients\' time series.')
+    parser.add_argument('--patients', type=int, nargs='+', default=[1000, 10000, 50000])
+    parser.add_argument('--days', type=int, default=14)
+    parser.add_argument('--pandas-max-patients', type=int, default=10000,
+                        help='Largest number of patients for which the pandas resampling is also timed.')
+    args = parser.parse_args()
+
+    for num in args.patients:
+        benchmark(num, args.days, pandas=num <= args.pandas_max_patients)
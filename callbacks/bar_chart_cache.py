@@ -0,0 +1,159 @@
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from callbacks.bar_chart_callbacks import update_bar_chart
+
+# Checklists with three states, see "PatientIndex.filter".
+CHECKLISTS = ['time_in_range_less_than_65', 'time_below_70_greater_than_4', 'time_below_54_greater_than_1']
+
+def bar_chart_key(window, populations, time_worn_less_than_75, time_in_range_less_than_65, time_below_70_greater_than_4, time_below_54_greater_than_1):
+    '''
+    Map the selected options of the bar chart filters to a key, such that the selections
+    resulting in the same bar chart are mapped to the same key.
+    '''
+
+    def state(options):
+        return options[0] if options in (['Yes'], ['No']) else None
+
+    return (
+        window,
+        frozenset(populations),
+        time_worn_less_than_75 == ['No'],
+        state(time_in_range_less_than_65),
+        state(time_below_70_greater_than_4),
+        state(time_below_54_greater_than_1),
+    )
+
+
+class BarChartCache:
+    '''
+    Materialized bar charts for every combination of the bar chart filters.
+
+    The bar charts are built in the background by a bounded pool of worker threads, once for each version of
+    the patients' dataset. Only the first page of each bar chart sorted by priority is materialized. Until a
+    bar chart has been built, or if the number of combinations exceeds the budget, the bar chart is built on demand.
+
+    Parameters:
+    ----------------------------------
+    store: PatientStore.
+        Patients' dataset.
+
+    windows: list of float.
+        Time windows of the bar chart to materialize, see "PatientStore.index".
+
+    budget: int.
+        Maximum number of combinations to materialize.
+
+    max_workers: int.
+        Number of worker threads.
+
+    page_size: int or None.
+        Number of patients in the first page, see "update_bar_chart".
+
+    Attributes:
+    ----------------------------------
+    charts: dict.
+        Bar chart figure, height, page number and page description of each combination, keyed by "bar_chart_key".
+
+    status: str.
+        'idle', 'running', 'done' or 'over budget'.
+    '''
+
+    def __init__(self, store, windows=[7], budget=1000, max_workers=2, page_size=50):
+
+        self.store = store
+        self.windows = windows
+        self.budget = budget
+        self.max_workers = max_workers
+        self.page_size = page_size
+        self.charts = {}
+        self.version = None
+        self.status = 'idle'
+        self.lock = threading.Lock()
+
+    def combinations(self):
+        '''
+        Return the selected options of every combination of the bar chart filters.
+        '''
+
+        populations = self.store.populations()
+
+        return [
+            (window, [x for x, selected in zip(populations, subset) if selected], worn, *checklists)
+            for window in self.windows
+            for subset in itertools.product([True, False], repeat=len(populations))
+            for worn in [[], ['No']]
+            for checklists in itertools.product([['Yes', 'No'], ['Yes'], ['No']], repeat=len(CHECKLISTS))
+        ]
+
+    def start(self):
+        '''
+        Start building the bar charts for the current version of the dataset in the background, unless the number
+        of combinations exceeds the budget.
+        '''
+
+        version = (self.store.loaded, self.store.version)
+
+        with self.lock:
+            self.charts = {}
+            self.version = version
+
+        combinations = self.combinations()
+
+        if len(combinations) > self.budget:
+            self.status = 'over budget'
+            return
+
+        # Build the patients' indexes before starting the workers, so that they are built only once.
+        for window in self.windows:
+            self.store.index(window)
+
+        self.status = 'running'
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        futures = [executor.submit(self._build, version, *x) for x in combinations]
+        executor.shutdown(wait=False)
+
+        def done():
+            for future in futures:
+                future.exception()
+            if self.version == version:
+                self.status = 'done'
+
+        threading.Thread(target=done, daemon=True).start()
+
+    def _build(self, version, window, *selection):
+        '''
+        Build the bar chart of a given combination, unless the dataset has changed in the meantime.
+        '''
+
+        if version != self.version:
+            return
+
+        figure, style, page, description = update_bar_chart(self.store.index(window), *selection, {}, 'priority', 0, self.page_size)
+
+        with self.lock:
+            if version == self.version:
+                self.charts[bar_chart_key(window, *selection)] = (figure, style['height'], page, description)
+
+    def get(self, window, populations, time_worn_less_than_75, time_in_range_less_than_65, time_below_70_greater_than_4, time_below_54_greater_than_1, style,
+            sort='priority', page=0, page_size=None):
+        '''
+        Return the bar chart for the selected options of the bar chart filters, see "update_bar_chart", from the
+        materialized bar charts if available, or building it on demand otherwise.
+        '''
+
+        selection = (populations, time_worn_less_than_75, time_in_range_less_than_65, time_below_70_greater_than_4, time_below_54_greater_than_1)
+
+        # Rebuild the bar charts in the background if the dataset has changed.
+        if self.status != 'idle' and self.version != (self.store.loaded, self.store.version):
+            self.start()
+
+        chart = self.charts.get(bar_chart_key(window, *selection)) if (sort, page, page_size) == ('priority', 0, self.page_size) else None
+
+        if chart is not None:
+            figure, height, page, description = chart
+            style['height'] = height
+            return [figure, style, page, description]
+
+        return update_bar_chart(self.store.index(window), *selection, style, sort, page, page_size)
@@ -1,23 +1,23 @@
 from visualizations.bar_chart import bar_chart
 from visualizations.empty_chart import empty_chart
 
-def update_bar_chart(data,
+def update_bar_chart(index,
                      populations,
                      time_worn_less_than_75,
                      time_in_range_less_than_65,
                      time_below_70_greater_than_4,
                      time_below_54_greater_than_1,
-                     click_data,
-                     figure,
                      style,
-                     changed_id):
+                     sort='priority',
+                     page=0,
+                     page_size=None):
     '''
     Update the bar chart.
 
     Parameters:
     ----------------------------------
-    data: pd.DataFrame.
-       Patients' dataset.
+    index: PatientIndex.
+       Bitmap index of the patients' statistics, see "PatientStore.index".
 
     populations: list of str.
         Selected options in "population-checklist".
@@ -34,95 +34,63 @@ def update_bar_chart(data,
     time_below_54_greater_than_1: list of str.
         Selected options in "time-below-54-greater-than-1-checklist".
 
-    click_data: dict.
-        Bar chart click data.
-
-    figure: dict.
-        Bar chart figure dictionary.
-
     style: dict.
         Bar chart style dictionary.
-    
-    changed_id: str.
-        Input that triggered the callback.
+
+    sort: str.
+        Selected option in "sort-dropdown", see "SORTS".
+
+    page: int.
+        Page number, starting from 0, which is limited to the number of pages.
+
+    page_size: int or None.
+        Selected option in "page-size-dropdown", None to display all the patients.
 
     Returns:
     ----------------------------------
     outputs: list.
-        The first item is the bar chart figure dictionary, the second item is the bar chart style dictionary.
+        The first item is the bar chart figure dictionary, the second item is the bar chart style dictionary,
+        the third item is the page number and the fourth item is the page description.
     '''
 
-    # If the filters have changed, draw a new bar chart.
-    if changed_id != 'bar-chart.clickData':
-    
-        # Copy the data.
-        data = data.copy()
-        
-        # Filter the data.
-        data = data[(data['most_recent_week'] == 1) & (data['population'].isin(populations))]
-        data = data[['id', 'name', 'device_worn (%)', 'bg (avg)', 'in_range (%)', 'hypo (%)', 'extreme_hypo (%)', 'rank', 'review']]
-        data = data.drop_duplicates(subset='id', ignore_index=True).fillna(value=0.)
-        
-        if time_worn_less_than_75 == ['No']:
-            data = data[data['device_worn (%)'] >= 0.75]
-
-        if time_in_range_less_than_65 == ['Yes']:
-            data = data[data['in_range (%)'] < 0.65]
-        
-        elif time_in_range_less_than_65 == ['No']:
-            data = data[data['in_range (%)'] >= 0.65]
-
-        if time_below_70_greater_than_4 == ['Yes']:
-            data = data[data['hypo (%)'] > 0.04]
-        
-        elif time_below_70_greater_than_4 == ['No']:
-            data = data[data['hypo (%)'] <= 0.04]
-
-        if time_below_54_greater_than_1 == ['Yes']:
-            data = data[data['extreme_hypo (%)'] > 0.01]
-        
-        elif time_below_54_greater_than_1 == ['No']:
-            data = data[data['extreme_hypo (%)'] <= 0.01]
-
-        # Sort the data.
-        data = data.sort_values(by=['review', 'rank'], ascending=[False, True], ignore_index=True)
-        
-        # If the data frame is not empty, return the bar chart.
-        if not data.empty:
-    
-            # Draw the bar chart.
-            figure = bar_chart(data)
-    
-            # Update the height of the figure.
-            style['height'] = 'calc(' + str(0.75 * data['id'].nunique()) + 'vw' + ' + ' + str(0.75 * data['id'].nunique()) + 'vh)'
-
-        # If the data frame is empty, return an empty chart.
-        else:
+    # Filter the data, and extract the page.
+    data, total = index.filter(
+        populations,
+        sort=sort,
+        page=page,
+        page_size=page_size,
+        time_worn_less_than_75=time_worn_less_than_75,
+        time_in_range_less_than_65=time_in_range_less_than_65,
+        time_below_70_greater_than_4=time_below_70_greater_than_4,
+        time_below_54_greater_than_1=time_below_54_greater_than_1,
+    )
     
-            # Draw an empty chart.
-            figure = empty_chart
+    # Count the pages, the pages past the last page are replaced by the last page.
+    pages = max(-(-total // page_size), 1) if page_size else 1
+    page = min(page, pages - 1)
     
-            # Update the height of the figure.
-            style['height'] = '100%'
+    # If the data frame is not empty, return the bar chart.
+    if not data.empty:
 
-    # If the selected patient has changed, update the existing bar chart.
-    else:
+        # Draw the bar chart, grouping the patients by priority group if they are sorted by priority.
+        figure = bar_chart(data, group=sort == 'priority')
 
-        # Extract the id of the selected patient.
-        patient_id = click_data['points'][0]['customdata']
+        # Update the height of the figure.
+        style['height'] = 'calc(' + str(0.75 * data['id'].nunique()) + 'vw' + ' + ' + str(0.75 * data['id'].nunique()) + 'vh)'
 
-        # Highlight the row of the bar chart corresponding to the selected patient.
-        for i in range(len(figure['data'])):
-
-            # Extract the row index of the selected patient.
-            index = list(figure['data'][i]['customdata']).index(patient_id)
+    # If the data frame is empty, return an empty chart.
+    else:
 
-            # Extract the current colors.
-            colors = list(figure['data'][i]['marker']['color'])
+        # Draw an empty chart.
+        figure = empty_chart
 
-            # Decrease the transparency for the selected patient, and increase the transparency for the other patients.
-            figure['data'][i]['marker']['color'] = [colors[j].replace('0.9', '0.45') if j != index else colors[j].replace('0.45', '0.9') for j in range(len(colors))]
+        # Update the height of the figure.
+        style['height'] = '100%'
+    
+    # Describe the page.
+    first = page * page_size if page_size else 0
+    description = 'Page {} of {}, patients {}-{} of {}'.format(page + 1, pages, min(first + 1, total), first + len(data), total)
     
-    outputs = [figure, style]
+    outputs = [figure, style, page, description]
     
     return outputs
@@ -0,0 +1,29 @@
+import pandas as pd
+import numpy as np
+
+from visualizations.calendar_grid_chart import calendar_grid_chart
+
+def update_calendar_grid_chart(store, id=None):
+    '''
+    Update the calendar grid chart, the alternative to the calendar chart which draws the last 3 weeks in one figure.
+
+    Parameters:
+    ----------------------------------
+    store: PatientStore.
+       Patients' dataset.
+
+    id: int or None.
+       Id of the selected patient, None if no patient is selected.
+
+    Returns:
+    ----------------------------------
+    figure: dict.
+        Figure dictionary.
+    '''
+
+    # Look up the hourly medians of the selected patient, or of all patients, in each of the last 21 days.
+    days, medians, readings = store.calendar(id)
+    hours = pd.to_datetime(np.arange(24), format='%H').strftime('%I %p')
+    
+    # Update the line charts of the hourly medians for each of the last 21 days.
+    return calendar_grid_chart(days.day.values, hours.values, medians, readings > 0)
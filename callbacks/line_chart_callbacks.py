@@ -2,39 +2,29 @@ import pandas as pd
 
 from visualizations.line_chart import line_chart
 
-def update_line_chart(data):
+def update_line_chart(store, id=None):
     '''
     Update the line chart.
 
     Parameters:
     ----------------------------------
-    data: pd.DataFrame.
+    store: PatientStore.
        Patients' dataset.
 
+    id: int or None.
+       Id of the selected patient, None if no patient is selected.
+
     Returns:
     ----------------------------------
     outputs: list.
         The first item is the figure title, the second item is the figure object.
     '''
 
-    # Copy the data.
-    data = data.copy()
-    
     # Update the title of the figure.
-    outputs = ['Glucose Levels for Patient: {}'.format(data['name'].iloc[0] if data['name'].nunique() == 1 else 'All')]
+    outputs = ['Glucose Levels for Patient: {}'.format(store.name(id))]
     
-    # Extract the hours from the timestamps.
-    data['hour'] = data['ts'].dt.hour
-    
-    # Define the percentiles.
-    def q90(x): return x.quantile(0.90)
-    def q75(x): return x.quantile(0.75)
-    def q50(x): return x.quantile(0.50)
-    def q25(x): return x.quantile(0.25)
-    def q10(x): return x.quantile(0.10)
-
-    # Calculate the hourly percentiles.
-    data = data.groupby(by='hour').agg({'bg': [q90, q75, q50, q25, q10]})
+    # Calculate the hourly percentiles of the selected patient, or of all patients, from the hourly histograms.
+    data = store.hourly_percentiles([0.90, 0.75, 0.50, 0.25, 0.10], id)
     data.columns = ['90%', '75% - IQR', '50% - Median', '25% - IQR', '10%']
     data['hour'] = pd.to_datetime(data.index, format='%H').strftime('%I %p')
     
@@ -1,13 +1,15 @@
-
-def update_table(data):
+def update_table(store, id=None):
     '''
     Update the table.
 
     Parameters:
     ----------------------------------
-    data: pd.DataFrame.
+    store: PatientStore.
        Patients' dataset.
 
+    id: int or None.
+       Id of the selected patient, None if no patient is selected.
+
     Returns:
     ----------------------------------
     outputs: list.
@@ -15,33 +17,36 @@ def update_table(data):
     '''
     
     # Update the title of the table.
-    outputs = ['CGM Data in Past 2 Weeks for Patient: {}'.format(data['name'].iloc[0] if data['name'].nunique() == 1 else 'All')]
+    outputs = ['CGM Data in Past 2 Weeks for Patient: {}'.format(store.name(id))]
+    
+    # Calculate the descriptive statistics of the selected patient, or of all patients.
+    stats = store.describe(id)
     
     # Update the average.
-    outputs.append(format(data['bg'].mean(), '.2f'))
+    outputs.append(format(stats['bg (avg)'], '.2f'))
 
     # Update the average time below 54.
-    outputs.append(format(data['extreme_hypo'].mean(), '.1%'))
+    outputs.append(format(stats['extreme_hypo (%)'], '.1%'))
 
     # Update the average time below 70.
-    outputs.append(format(data['hypo'].mean(), '.1%'))
+    outputs.append(format(stats['hypo (%)'], '.1%'))
 
     # Update the average time in range.
-    outputs.append(format(data['in_range'].mean(), '.1%'))
+    outputs.append(format(stats['in_range (%)'], '.1%'))
 
     # Update the average time above 180.
-    outputs.append(format(data['hyp'].mean(), '.1%'))
+    outputs.append(format(stats['hyp (%)'], '.1%'))
 
     # Update the average time above 250.
-    outputs.append(format(data['extreme_hyp'].mean(), '.1%'))
+    outputs.append(format(stats['extreme_hyp (%)'], '.1%'))
 
     # Update the coefficient of variation.
-    outputs.append(format(data['bg'].std() / data['bg'].mean(), '.1%'))
+    outputs.append(format(stats['bg (cv)'], '.1%'))
 
     # Update the sample standard deviation.
-    outputs.append(format(data['bg'].std(), '.1f'))
+    outputs.append(format(stats['bg (std)'], '.1f'))
 
     # Update the average time worn.
-    outputs.append(format(data['device_worn'].mean(), '.1%'))
+    outputs.append(format(stats['device_worn (%)'], '.1%'))
 
     return outputs
@@ -0,0 +1,118 @@
+import json
+import threading
+from collections import OrderedDict
+from plotly.utils import PlotlyJSONEncoder
+
+class ViewCache:
+    '''
+    Least recently used cache of the outputs of the patient views, bounded by their size.
+
+    The outputs are keyed by view and patient id, and are valid for a given version of the patients' dataset.
+    When a different version is requested, all the cached outputs are discarded. The size of each output is
+    measured as the length of its JSON serialization, which is also what is sent to the browser.
+
+    Parameters:
+    ----------------------------------
+    max_bytes: int.
+        Maximum total size of the cached outputs (in bytes).
+
+    Attributes:
+    ----------------------------------
+    hits, misses, evictions, invalidations: int.
+        Number of lookups which found a cached output, number of lookups which did not, number of outputs
+        discarded to stay within the maximum size and number of times the cache was cleared because the
+        dataset version changed.
+
+    bytes: int.
+        Total size of the cached outputs (in bytes).
+    '''
+
+    def __init__(self, max_bytes=64 * 2 ** 20):
+
+        self.max_bytes = max_bytes
+        self.version = None
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.lock = threading.Lock()
+
+    def get(self, key, version, compute):
+        '''
+        Return the cached output for a given key and dataset version, computing and caching it if needed.
+
+        Parameters:
+        ----------------------------------
+        key: tuple.
+            View name and patient id.
+
+        version: hashable.
+            Version of the patients' dataset.
+
+        compute: callable.
+            Function without arguments returning the output.
+
+        Returns:
+        ----------------------------------
+        Output of the view.
+        '''
+
+        with self.lock:
+
+            # Discard the outputs of previous versions of the dataset.
+            if version != self.version:
+                if self.entries:
+                    self.invalidations += 1
+                self.clear()
+                self.version = version
+
+            # Return the cached output, marking it as the most recently used.
+            if key in self.entries:
+                self.hits += 1
+                self.entries.move_to_end(key)
+                return self.entries[key][0]
+
+            self.misses += 1
+
+        output = compute()
+        size = len(json.dumps(output, cls=PlotlyJSONEncoder))
+
+        with self.lock:
+
+            # Cache the output, unless the dataset has changed in the meantime or the output is too large.
+            if version == self.version and key not in self.entries and size <= self.max_bytes:
+                self.entries[key] = (output, size)
+                self.bytes += size
+
+                # Evict the least recently used outputs.
+                while self.bytes > self.max_bytes:
+                    _, (_, evicted) = self.entries.popitem(last=False)
+                    self.bytes -= evicted
+                    self.evictions += 1
+
+        return output
+
+    def clear(self):
+        '''
+        Discard all the cached outputs.
+        '''
+
+        self.entries.clear()
+        self.bytes = 0
+
+    def stats(self):
+        '''
+        Return the counters of the cache.
+        '''
+
+        return {
+            'entries': len(self.entries),
+            'bytes': self.bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'invalidations': self.invalidations,
+        }
@@ -0,0 +1,271 @@
+import os
+import re
+import glob
+import json
+import shutil
+import hashlib
+import pandas as pd
+import numpy as np
+
+# Version of the preprocessing code, to be increased whenever the preprocessed dataset changes.
+CACHE_VERSION = 7
+
+def file_digest(path, directory=None):
+    '''
+    Hash the contents of a file. The hash is kept in a sidecar file in the cache directory together with the size
+    and modification time of the file, so that the file is only hashed again when it has changed.
+
+    Parameters:
+    ----------------------------------
+    path: str.
+        Path to the file.
+
+    directory: str or None.
+        Cache directory. If None, the file is always hashed.
+
+    Returns:
+    ----------------------------------
+    str.
+        Hexadecimal hash of the file.
+    '''
+
+    stat = os.stat(path)
+    signature = {'path': os.path.abspath(path), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+    # Look up the hash of the file, if its size and modification time have not changed.
+    if directory is not None:
+        sidecar = os.path.join(directory, 'files', hashlib.sha256(signature['path'].encode()).hexdigest() + '.json')
+
+        try:
+            with open(sidecar) as f:
+                metadata = json.load(f)
+            if {x: metadata.get(x) for x in signature} == signature:
+                return metadata['digest']
+        except (OSError, ValueError, KeyError):
+            pass
+
+    # Hash the contents of the file, in blocks.
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    digest = digest.hexdigest()
+
+    # Save the hash of the file, replacing the previous one atomically.
+    if directory is not None:
+        os.makedirs(os.path.dirname(sidecar), exist_ok=True)
+        temp = f'{sidecar}.{os.getpid()}.tmp'
+        with open(temp, 'w') as f:
+            json.dump(dict(signature, digest=digest), f)
+        os.replace(temp, sidecar)
+
+    return digest
+
+
+def cache_key(paths, directory=None, **params):
+    '''
+    Hash the input files, the preprocessing parameters and the code version into a cache key.
+
+    Parameters:
+    ----------------------------------
+    paths: list of str.
+        Paths to the input files.
+
+    directory: str or None.
+        Cache directory, where the hashes of the input files are kept, see "file_digest".
+
+    params: dict.
+        Preprocessing parameters, which must be JSON serializable.
+
+    Returns:
+    ----------------------------------
+    str.
+        Hexadecimal cache key.
+    '''
+
+    key = hashlib.sha256()
+
+    # Hash the code version and the parameters.
+    key.update(json.dumps({'version': CACHE_VERSION, 'params': params}, sort_keys=True).encode())
+
+    # Hash the hashes of the input files.
+    for path in paths:
+        key.update(file_digest(path, directory).encode())
+
+    return key.hexdigest()
+
+
+def save_cache(directory, key, tables, arrays={}, keep=4):
+    '''
+    Save the preprocessed tables and arrays to the cache, as one NumPy array per column or array plus a
+    JSON metadata file, so that they can be loaded without pickling. The arrays are written to a temporary directory which is then renamed, so that
+    readers never see a partially written cache entry.
+
+    Parameters:
+    ----------------------------------
+    directory: str.
+        Cache directory.
+
+    key: str.
+        Cache key, see "cache_key".
+
+    tables: dict of pd.DataFrame.
+        Preprocessed tables, by name, with numeric, datetime or text columns. Other columns raise a TypeError.
+
+    arrays: dict of np.ndarray.
+        Preprocessed arrays, by name.
+
+    keep: int.
+        Number of cache entries kept once the new entry has been published, see "prune_cache".
+    '''
+
+    # Check that all the columns can be stored without pickling.
+    for name, df in tables.items():
+        for column in df.columns:
+            values = df[column].to_numpy()
+            if values.dtype == object and pd.api.types.infer_dtype(values) not in ['string', 'empty']:
+                raise TypeError(f'Column {column!r} of table {name!r} cannot be cached, only numeric, datetime and text columns are supported.')
+
+    path = os.path.join(directory, key)
+    temp = f'{path}.{os.getpid()}.tmp'
+    os.makedirs(temp, exist_ok=True)
+
+    metadata = {'key': key, 'version': CACHE_VERSION, 'tables': {}, 'arrays': list(arrays)}
+
+    for name, df in tables.items():
+
+        metadata['tables'][name] = []
+
+        for i, column in enumerate(df.columns):
+
+            # Store the text columns as fixed width strings, with a mask of the missing values.
+            values = df[column].to_numpy()
+            text = values.dtype == object
+            null = text and bool(pd.isna(values).any())
+
+            if text:
+                if null:
+                    np.save(os.path.join(temp, f'{name}.{i}.null.npy'), pd.isna(values), allow_pickle=False)
+                values = np.where(pd.isna(values), '', values).astype(str)
+
+            np.save(os.path.join(temp, f'{name}.{i}.npy'), values, allow_pickle=False)
+
+            metadata['tables'][name].append({'column': column, 'text': text, 'null': null})
+
+    for name, values in arrays.items():
+        np.save(os.path.join(temp, f'{name}.npy'), values, allow_pickle=False)
+
+    with open(os.path.join(temp, 'metadata.json'), 'w') as f:
+        json.dump(metadata, f)
+
+    # Publish the cache entry, unless another process has already done so.
+    try:
+        os.rename(temp, path)
+    except OSError:
+        shutil.rmtree(temp, ignore_errors=True)
+        return
+
+    # Remove the old cache entries.
+    prune_cache(directory, keep)
+
+
+def prune_cache(directory, keep=4):
+    '''
+    Remove the least recently used cache entries, keeping the given number of entries. The entries with files
+    memory-mapped by a running process, as listed in "/proc/<pid>/maps", are never removed.
+
+    Parameters:
+    ----------------------------------
+    directory: str.
+        Cache directory.
+
+    keep: int.
+        Number of cache entries kept.
+    '''
+
+    # Sort the cache entries from the most to the least recently used.
+    entries = [os.path.join(directory, x) for x in os.listdir(directory) if re.fullmatch('[0-9a-f]{64}', x)]
+    entries.sort(key=os.path.getmtime, reverse=True)
+
+    # Find the files memory-mapped by the running processes.
+    mapped = set()
+    for maps in glob.glob('/proc/[0-9]*/maps'):
+        try:
+            with open(maps) as f:
+                for line in f:
+                    fields = line.split(maxsplit=5)
+                    if len(fields) == 6:
+                        mapped.add(os.path.dirname(fields[5].strip()))
+        except OSError:
+            pass
+
+    # Remove the other entries.
+    for path in entries[keep:]:
+        if os.path.realpath(path) not in mapped:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def load_cache(directory, key, mmap_mode=None):
+    '''
+    Load the preprocessed tables and arrays from the cache, see "save_cache". The arrays can be memory-mapped,
+    in which case all the processes loading the same cache entry share their pages through the page cache.
+
+    Parameters:
+    ----------------------------------
+    directory: str.
+        Cache directory.
+
+    key: str.
+        Cache key, see "cache_key".
+
+    mmap_mode: str or None.
+        Memory-mapping mode of the arrays, see "np.load", e.g. 'r' for read-only views. If None, the arrays are read into memory.
+
+    Returns:
+    ----------------------------------
+    tables: dict of pd.DataFrame or None.
+        Preprocessed tables, by name, or None if the cache entry does not exist or is not valid.
+
+    arrays: dict of np.ndarray or None.
+        Preprocessed arrays, by name, or None if the cache entry does not exist or is not valid.
+    '''
+
+    path = os.path.join(directory, key)
+
+    try:
+        with open(os.path.join(path, 'metadata.json')) as f:
+            metadata = json.load(f)
+    except (OSError, ValueError):
+        return None, None
+
+    if metadata.get('key') != key or metadata.get('version') != CACHE_VERSION:
+        return None, None
+
+    # Mark the cache entry as recently used, see "prune_cache".
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+    tables = {}
+
+    for name, columns in metadata['tables'].items():
+
+        data = {}
+
+        for i, column in enumerate(columns):
+            values = np.load(os.path.join(path, f'{name}.{i}.npy'), allow_pickle=False)
+
+            # Restore the missing values of the text columns.
+            if column['text']:
+                values = values.astype(object)
+                if column['null']:
+                    values[np.load(os.path.join(path, f'{name}.{i}.null.npy'), allow_pickle=False)] = np.nan
+
+            data[column['column']] = values
+
+        tables[name] = pd.DataFrame(data)
+
+    arrays = {name: np.load(os.path.join(path, f'{name}.npy'), mmap_mode=mmap_mode) for name in metadata.get('arrays', [])}
+
+    return tables, arrays
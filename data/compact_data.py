@@ -0,0 +1,63 @@
+import pandas as pd
+import numpy as np
+
+def compact_data(df):
+    '''
+    Convert the preprocessed readings to compact dtypes: the patient ids are stored as 32-bit integers,
+    the flags as booleans or small integers and the blood glucose levels as single precision floats.
+
+    Parameters:
+    ----------------------------------
+    df: pd.DataFrame.
+        Preprocessed patients' time series dataset, see "preprocess_data".
+
+    Returns:
+    ----------------------------------
+    df: pd.DataFrame.
+        Preprocessed patients' time series dataset with compact dtypes.
+    '''
+
+    return df.astype({
+        'id': np.int32,
+        'bg': np.float32,
+        'most_recent_week': bool,
+        'bg_range': np.int8,
+    })
+
+
+def memory_report(df, weeks, patients):
+    '''
+    Compare the memory usage of the preprocessed patients' dataset before and after the conversion
+    to compact dtypes.
+
+    Parameters:
+    ----------------------------------
+    df: pd.DataFrame.
+        Preprocessed patients' time series dataset, see "preprocess_data".
+
+    weeks: pd.DataFrame.
+        Patients' weekly statistics, see "preprocess_data".
+
+    patients: pd.DataFrame.
+        Patients' table.
+
+    Returns:
+    ----------------------------------
+    pd.DataFrame.
+        Data frame with the bytes per reading of each column of the readings, of the weekly statistics
+        and patients' tables, and in total, before and after the conversion.
+    '''
+
+    report = pd.DataFrame({
+        'before': df.memory_usage(index=False, deep=True),
+        'after': compact_data(df).memory_usage(index=False, deep=True),
+    })
+
+    # The weekly statistics and patients' tables are not repeated on every reading.
+    report.loc['weekly statistics'] = weeks.memory_usage(index=False, deep=True).sum()
+    report.loc['patients'] = patients.memory_usage(index=False, deep=True).sum()
+
+    report = report / len(df)
+    report.loc['total'] = report.sum()
+
+    return report
@@ -0,0 +1,124 @@
+import numpy as np
+
+# Threshold predicates of the bar chart checklists.
+PREDICATES = {
+    'time_worn_less_than_75': ('device_worn (%)', np.less, 0.75),
+    'time_in_range_less_than_65': ('in_range (%)', np.less, 0.65),
+    'time_below_70_greater_than_4': ('hypo (%)', np.greater, 0.04),
+    'time_below_54_greater_than_1': ('extreme_hypo (%)', np.greater, 0.01),
+}
+
+# Sort orders of the bar chart, by priority group and rank, or by each metric with the most concerning values first.
+SORTS = {
+    'priority': None,
+    'device_worn (%)': True,
+    'bg (avg)': False,
+    'in_range (%)': True,
+    'hypo (%)': False,
+    'extreme_hypo (%)': False,
+}
+
+class PatientIndex:
+    '''
+    Bitmap index of the patients displayed in the bar chart.
+
+    The patients are presorted by priority group and rank, with the highest priority first, and each population and each threshold predicate
+    of the bar chart checklists is stored as a bitmap over the presorted patients, so that any combination
+    of the checklists is applied with a few bitwise operations followed by a gather in presorted order.
+    The orders of the patients by each metric are precomputed as well, see "SORTS".
+
+    Parameters:
+    ----------------------------------
+    data: pd.DataFrame.
+       Patients' statistics, one row per patient, see "PatientStore.summary".
+
+    Attributes:
+    ----------------------------------
+    data: pd.DataFrame.
+        Patients' statistics, with missing values replaced by zeros, sorted by priority group and rank.
+
+    populations: dict of np.ndarray.
+        Packed bitmap of the patients in each population.
+
+    predicates: dict of np.ndarray.
+        Packed bitmap of the patients satisfying each threshold predicate, see "PREDICATES".
+
+    orders: dict of np.ndarray.
+        Positions of the presorted patients in each sort order, see "SORTS". Ties are ordered by priority group and rank.
+    '''
+
+    def __init__(self, data):
+
+        # Sort the patients by priority group and rank.
+        data = data[['id', 'name', 'population', 'device_worn (%)', 'bg (avg)', 'in_range (%)', 'hypo (%)', 'extreme_hypo (%)', 'rank', 'review']]
+        data = data.reset_index(drop=True).fillna(value=0.)
+        data = data.sort_values(by=['review', 'rank'], ascending=[True, True], ignore_index=True)
+
+        self.populations = {x: np.packbits(data['population'].values == x) for x in data['population'].unique()}
+        self.predicates = {x: np.packbits(op(data[column].values, threshold)) for x, (column, op, threshold) in PREDICATES.items()}
+        self.data = data.drop(columns='population')
+
+        self.orders = {
+            x: np.arange(len(data)) if ascending is None else np.argsort(data[x].values if ascending else -data[x].values, kind='stable')
+            for x, ascending in SORTS.items()
+        }
+
+    def filter(self, populations, sort='priority', page=0, page_size=None, **checklists):
+        '''
+        Return a page of the patients in the given populations which satisfy the selected options of the checklists.
+
+        Parameters:
+        ----------------------------------
+        populations: list of str.
+            Selected populations.
+
+        sort: str.
+            Sort order, see "SORTS".
+
+        page: int.
+            Page number, starting from 0. Pages past the last page are replaced by the last page.
+
+        page_size: int or None.
+            Number of patients in each page. If None, all the patients are returned in one page.
+
+        checklists: list of str.
+            Selected options of each checklist, by predicate, see "PREDICATES". If only 'Yes' is selected, the patients
+            satisfying the predicate are returned. If only 'No' is selected, the patients not satisfying the predicate are
+            returned. Otherwise the checklist is ignored. The 'time_worn_less_than_75' checklist is applied only if 'No'
+            is selected.
+
+        Returns:
+        ----------------------------------
+        data: pd.DataFrame.
+            Patients' statistics in the page, in the given sort order, starting from the highest priority or the most
+            concerning value.
+
+        total: int.
+            Number of patients across all the pages.
+        '''
+
+        bitmap = np.zeros((len(self.data) + 7) // 8, dtype=np.uint8)
+
+        # Select the patients in the given populations.
+        for population in populations:
+            if population in self.populations:
+                bitmap |= self.populations[population]
+
+        # Select the patients satisfying the predicates.
+        for name, options in checklists.items():
+            if options == ['Yes'] and name != 'time_worn_less_than_75':
+                bitmap &= self.predicates[name]
+
+            elif options == ['No']:
+                bitmap &= ~self.predicates[name]
+
+        # Sort the selected patients.
+        selected = np.unpackbits(bitmap, count=len(self.data)).view(bool)
+        positions = self.orders[sort][selected[self.orders[sort]]]
+
+        # Gather the selected patients in the page.
+        if page_size:
+            page = min(page, max(len(positions) - 1, 0) // page_size)
+            positions = positions[page * page_size:(page + 1) * page_size]
+
+        return self.data.iloc[positions].reset_index(drop=True), int(selected.sum())
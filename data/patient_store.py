@@ -0,0 +1,698 @@
+import pandas as pd
+import numpy as np
+
+from algorithm.resample_data import resample_data
+from algorithm.daily_medians import daily_medians
+from algorithm.hourly_histograms import BINS, hourly_histograms, daily_histograms, histogram_percentiles
+from data.patient_index import PatientIndex
+from algorithm.rank_patients import MISSING, classify_readings, range_percentages, weekly_statistics, ranking_data, rank_patients, prioritize_patients
+
+class PatientStore:
+    '''
+    Array-backed store of the preprocessed patients' dataset.
+
+    The readings of each patient are held as contiguous NumPy arrays, sorted by patient id and timestamp,
+    together with an offset table keyed by patient id. The per-patient attributes and the per-patient-week
+    statistics are held in separate tables, so that they are not repeated on every reading.
+
+    Parameters:
+    ----------------------------------
+    df: pd.DataFrame.
+        Preprocessed patients' time series dataset, sorted by patient id and timestamp, see "preprocess_data".
+
+    weeks: pd.DataFrame.
+        Patients' weekly statistics, see "preprocess_data".
+
+    patients: pd.DataFrame.
+        Patients' table, with columns 'id', 'name', 'population', 'rank' and 'review'.
+
+    Attributes:
+    ----------------------------------
+    ids: np.ndarray.
+        Patient ids, sorted in ascending order.
+
+    offsets: np.ndarray.
+        Offsets of the patients' readings, the readings of the patient with id "ids[i]" are stored
+        between "offsets[i]" (included) and "offsets[i + 1]" (excluded).
+
+    ts: np.ndarray.
+        Timestamps of the readings.
+
+    bg: np.ndarray.
+        Blood glucose levels of the readings.
+
+    most_recent_week: np.ndarray.
+        True if the reading falls within the most recent week, False otherwise.
+
+    bg_range: np.ndarray.
+        Glucose range codes of the readings, see "classify_readings".
+
+    cumulative_counts: np.ndarray.
+        Cumulative counts of the readings in each glucose range, with one more row than the readings, the counts
+        of the readings between positions "i" (included) and "j" (excluded) are "cumulative_counts[j] - cumulative_counts[i]".
+
+    cumulative_bg: np.ndarray.
+        Cumulative sums of the blood glucose levels of the readings, defined as "cumulative_counts".
+
+    histograms: np.ndarray.
+        Counts of the readings of each patient in each hour of the day and blood glucose level bin, see "hourly_histograms".
+
+    statistics: np.ndarray.
+        Sufficient statistics of the readings of each patient, array with shape (len(ids), MISSING + 3), with the
+        counts of the readings in each glucose range, the count of the missing readings, the sum and the sum of
+        squares of the blood glucose levels.
+
+    cube: pd.DataFrame.
+        Sufficient statistics summed over the patients in each population, indexed by population.
+
+    calendar_start: np.datetime64.
+        First day of the calendar, which covers the 3 weeks up to the Sunday after the most recent timestamp.
+
+    calendar_medians, calendar_readings, calendar_valid: np.ndarray.
+        Hourly medians, number of readings and number of non-missing readings of each patient in each day of the
+        calendar, see "daily_medians". The population's hourly medians, which cannot be derived from the patients'
+        medians, are stored in "population_medians", "population_readings" and "population_valid".
+
+    population_histograms: np.ndarray.
+        Counts of the readings of all patients in each day of the calendar, hour and blood glucose level bin, see
+        "daily_histograms", from which the population's hourly medians are calculated.
+
+    patients: pd.DataFrame.
+        Patients' table, indexed by patient id, with columns 'name', 'population', 'rank' and 'review'.
+
+    weeks: pd.DataFrame.
+        Weekly statistics table, indexed by patient id and most recent week flag, with columns 'device_worn (%)',
+        'extreme_hypo (%)', 'hypo (%)', 'in_range (%)', 'hyp (%)', 'extreme_hyp (%)' and 'bg (avg)'.
+
+    freq: float.
+        Frequency of the time series (in minutes).
+
+    version: int.
+        Number of updates applied to the store since it was built.
+
+    loaded: pd.Timestamp.
+        Time when the store was built or loaded, which together with "version" identifies the dataset.
+    '''
+
+    def __init__(self, df, weeks, patients):
+
+        # Store the patients' table.
+        self.patients = patients.set_index('id')[['name', 'population', 'rank', 'review']].sort_index()
+
+        # Store the weekly statistics table.
+        self.weeks = weeks.set_index(['id', 'most_recent_week']).sort_index()
+
+        # Store the readings as contiguous arrays.
+        self.ids = self.patients.index.values
+        self.ts = df['ts'].values
+        self.bg = df['bg'].values
+        self.most_recent_week = df['most_recent_week'].values == 1.
+        self.bg_range = df['bg_range'].values
+
+        # Build the offset table.
+        ids = df['id'].values
+        self.offsets = self._offsets(ids)
+
+        # Infer the frequency of the time series (in minutes).
+        diffs = pd.Series(np.diff(self.ts)[ids[1:] == ids[:-1]])
+        self.freq = diffs.mode()[0].total_seconds() / 60 if len(diffs) else 5.
+
+        # Build the cumulative sums.
+        self._cumulate()
+        self._statistics()
+        self._histograms()
+        self._calendar()
+
+        self.version = 0
+        self.loaded = pd.Timestamp.now()
+        self._indexes = {}
+
+    def to_arrays(self):
+        '''
+        Return the patients' and weekly statistics tables and the readings arrays of the store, which can be
+        saved and memory-mapped, see "from_arrays".
+        '''
+
+        tables = {
+            'patients': self.patients.reset_index(drop=False),
+            'weeks': self.weeks.reset_index(drop=False),
+        }
+
+        arrays = {x: getattr(self, x) for x in ['ids', 'offsets', 'ts', 'bg', 'most_recent_week', 'bg_range', 'cumulative_counts', 'cumulative_bg', 'statistics', 'histograms',
+            'calendar_medians', 'calendar_readings', 'calendar_valid', 'population_medians', 'population_readings', 'population_valid', 'population_histograms']}
+        arrays['calendar_start'] = np.array(self.calendar_start)
+        arrays['freq'] = np.array(self.freq)
+
+        return tables, arrays
+
+    @classmethod
+    def from_arrays(cls, tables, arrays):
+        '''
+        Build the store from the tables and arrays returned by "to_arrays". The arrays are used as they are,
+        without copying them, so that read-only memory-mapped arrays are shared by all the processes mapping
+        the same files. Updates copy the read-only arrays before modifying them, see "_writeable", so an updated
+        store is no longer shared, see "update".
+        '''
+
+        store = cls.__new__(cls)
+        store.patients = tables['patients'].set_index('id').sort_index()
+        store.weeks = tables['weeks'].set_index(['id', 'most_recent_week']).sort_index()
+
+        for name, values in arrays.items():
+            setattr(store, name, values)
+
+        store.freq = float(arrays['freq'])
+        store.calendar_start = arrays['calendar_start'][()]
+        store._cube()
+        store.version = 0
+        store.loaded = pd.Timestamp.now()
+        store._indexes = {}
+
+        return store
+
+    def _cumulate(self, start=0):
+        '''
+        Build the cumulative counts of the readings in each glucose range and the cumulative sums of the
+        blood glucose levels, which are used for calculating the statistics over any time window. Only the
+        entries from the reading at position "start" onward are rebuilt, the previous ones are kept.
+        '''
+
+        cumulative_counts = np.zeros((len(self.bg_range) + 1, MISSING), dtype=np.uint32)
+        cumulative_bg = np.zeros(len(self.bg) + 1, dtype=float)
+
+        # Keep the entries before the given reading.
+        if start:
+            cumulative_counts[1:start + 1] = self.cumulative_counts[1:start + 1]
+            cumulative_bg[1:start + 1] = self.cumulative_bg[1:start + 1]
+
+        # Rebuild the entries from the given reading onward.
+        for code in range(MISSING):
+            np.cumsum(self.bg_range[start:] == code, out=cumulative_counts[start + 1:, code])
+            cumulative_counts[start + 1:, code] += cumulative_counts[start, code]
+
+        cumulative_bg[start + 1:] = cumulative_bg[start] + np.cumsum(np.nan_to_num(self.bg[start:]), dtype=float)
+
+        self.cumulative_counts = cumulative_counts
+        self.cumulative_bg = cumulative_bg
+
+    def _statistics(self, rows=None):
+        '''
+        Build the sufficient statistics of each patient, or only of the patients at the given positions, and
+        sum them over the patients in each population, which are used for calculating the descriptive statistics
+        of any set of patients.
+        '''
+
+        patients, index = self._select(rows)
+        n = len(self.ids) if rows is None else len(rows)
+        bg = np.nan_to_num(self.bg[index]).astype(float)
+
+        statistics = np.c_[
+            np.bincount(patients * (MISSING + 1) + self.bg_range[index], minlength=n * (MISSING + 1)).reshape(-1, MISSING + 1),
+            np.bincount(patients, weights=bg, minlength=n),
+            np.bincount(patients, weights=bg ** 2, minlength=n),
+        ]
+
+        if rows is None:
+            self.statistics = statistics
+
+        else:
+            self._writeable('statistics')
+            self.statistics[rows] = statistics
+
+        self._cube()
+
+    def _cube(self):
+        '''
+        Sum the sufficient statistics over the patients in each population.
+        '''
+
+        self.cube = pd.DataFrame(self.statistics).groupby(self.patients['population'].values).sum()
+
+    def _histograms(self, rows=None):
+        '''
+        Build the hourly histograms of the blood glucose levels of each patient, or only of the patients at the
+        given positions, which are used for calculating the hourly percentiles of any set of patients.
+        '''
+
+        patients, index = self._select(rows)
+
+        if rows is None:
+            self.histograms = hourly_histograms(patients, self.ts, self.bg, len(self.ids))
+
+        else:
+            self._writeable('histograms')
+            self.histograms[rows] = hourly_histograms(patients, self.ts[index], self.bg[index], len(rows))
+
+    def _calendar(self, rows=None, removed=None):
+        '''
+        Build the hourly medians of the blood glucose levels of each patient, or only of the patients at the
+        given positions, and of all the patients, in each day of the calendar. The patients' previous readings,
+        a tuple with their timestamps and blood glucose levels, are removed from the population's histograms.
+        All the patients are rebuilt if the calendar has moved.
+        '''
+
+        # Define the calendar, the 3 weeks up to the Sunday after the most recent timestamp.
+        end = pd.Timestamp(self.ts.max()).date() + pd.offsets.Week(weekday=6) if len(self.ts) else pd.Timestamp(0)
+        start = np.datetime64(end - pd.offsets.Day(n=20), 'D')
+
+        if rows is None or start != self.calendar_start:
+            self.calendar_start = start
+
+            patients, _ = self._select()
+            self.calendar_medians, self.calendar_readings, self.calendar_valid = \
+                daily_medians(patients, self.ts, self.bg, len(self.ids), start)
+
+            self.population_histograms = daily_histograms(self.ts, self.bg, start)
+            self.population_readings = self.calendar_readings.sum(axis=0, dtype=np.uint32)[None]
+            self.population_valid = self.calendar_valid.sum(axis=0, dtype=np.uint32)[None]
+
+        else:
+            self._writeable('calendar_medians', 'calendar_readings', 'calendar_valid')
+
+            # Replace the patients' readings in the population's counts.
+            patients, index = self._select(rows)
+            medians, readings, valid = daily_medians(patients, self.ts[index], self.bg[index], len(rows), start)
+
+            self.population_histograms = self.population_histograms + daily_histograms(self.ts[index], self.bg[index], start) - daily_histograms(*removed, start)
+            self.population_readings = (self.population_readings + readings.sum(axis=0) - self.calendar_readings[rows].sum(axis=0)).astype(np.uint32)
+            self.population_valid = (self.population_valid + valid.sum(axis=0) - self.calendar_valid[rows].sum(axis=0)).astype(np.uint32)
+
+            self.calendar_medians[rows], self.calendar_readings[rows], self.calendar_valid[rows] = medians, readings, valid
+
+        # Calculate the population's hourly medians from the population's histograms.
+        self.population_medians = histogram_percentiles(self.population_histograms.reshape(-1, len(BINS) - 1), [0.5]) \
+            .astype(self.bg.dtype).reshape(1, -1, 24)
+
+    def _select(self, rows=None):
+        '''
+        Return the position of the patient of each reading among the patients at the given positions, and the
+        positions of these readings, or the positions of the patients of all readings if no positions are given.
+        '''
+
+        if rows is None:
+            return np.repeat(np.arange(len(self.ids)), np.diff(self.offsets)), slice(None)
+
+        counts = self.offsets[rows + 1] - self.offsets[rows]
+        patients = np.repeat(np.arange(len(rows)), counts)
+        index = np.arange(counts.sum()) + np.repeat(self.offsets[rows] - np.cumsum(counts) + counts, counts)
+
+        return patients, index
+
+    def _writeable(self, *names):
+        '''
+        Copy the given arrays if they are read-only, e.g. memory-mapped, so that they can be modified in place.
+        '''
+
+        for name in names:
+            if not getattr(self, name).flags.writeable:
+                setattr(self, name, np.array(getattr(self, name)))
+
+    def _offsets(self, ids):
+        '''
+        Build the offset table from the sorted patient ids of the readings, which must all be present in the store.
+        '''
+
+        # Check that all the patients are present in the store.
+        unknown = np.unique(ids[~np.isin(ids, self.ids)])
+        if len(unknown):
+            raise KeyError(f'Unknown patient ids: {unknown.tolist()}')
+
+        counts = np.bincount(np.searchsorted(self.ids, ids), minlength=len(self.ids))
+
+        return np.r_[0, np.cumsum(counts)]
+
+    def populations(self):
+        '''
+        Return the sorted list of populations.
+        '''
+
+        return self.patients['population'].sort_values().unique().tolist()
+
+    def name(self, id=None):
+        '''
+        Return the name of a patient, or 'All' if no patient is given.
+        '''
+
+        return self.patients.at[id, 'name'] if id is not None else 'All'
+
+    def locate(self, id):
+        '''
+        Return the slice of the readings arrays corresponding to a given patient.
+        '''
+
+        i = np.searchsorted(self.ids, id)
+
+        if i == len(self.ids) or self.ids[i] != id:
+            raise KeyError(id)
+
+        return slice(self.offsets[i], self.offsets[i + 1])
+
+    def readings(self, id=None):
+        '''
+        Return the readings of a given patient, or of all patients if no patient is given.
+
+        Parameters:
+        ----------------------------------
+        id: int or None.
+            Patient id.
+
+        Returns:
+        ----------------------------------
+        pd.DataFrame.
+            Data frame with the following columns:
+
+            'id': int.
+                Patient id.
+
+            'ts': pd.datetime.
+                Timestamp.
+
+            'bg': float.
+                Blood glucose level.
+
+            'most_recent_week': float.
+                1.0 if the timestamp falls within the most recent week, 0.0 otherwise.
+
+            'bg_range': int.
+                Glucose range code, see "classify_readings".
+        '''
+
+        index = self.locate(id) if id is not None else slice(None)
+
+        return self._readings(index)
+
+    def _readings(self, index):
+        '''
+        Return the readings at a given slice or mask of the readings arrays, see "readings".
+        '''
+
+        return pd.DataFrame({
+            'id': np.repeat(self.ids, np.diff(self.offsets))[index],
+            'ts': self.ts[index],
+            'bg': self.bg[index],
+            'most_recent_week': self.most_recent_week[index].astype(float),
+            'bg_range': self.bg_range[index],
+        })
+
+    def hourly_percentiles(self, q, id=None):
+        '''
+        Calculate the hourly percentiles of the blood glucose levels of a given patient, or of all patients
+        if no patient is given, from the sum of the patients' hourly histograms, see "histogram_percentiles".
+
+        Parameters:
+        ----------------------------------
+        q: list of float.
+            Percentiles, between 0 and 1.
+
+        id: int or None.
+            Patient id.
+
+        Returns:
+        ----------------------------------
+        pd.DataFrame.
+            Data frame indexed by hour of the day, with one column for each percentile. Hours without readings are excluded.
+        '''
+
+        if id is not None:
+            self.locate(id)
+            histograms = self.histograms[np.searchsorted(self.ids, id)]
+
+        else:
+            histograms = self.histograms.sum(axis=0)
+
+        data = pd.DataFrame(histogram_percentiles(histograms, q), columns=q).rename_axis('hour')
+
+        return data.dropna(how='all')
+
+    def calendar(self, id=None):
+        '''
+        Return the hourly medians of the blood glucose levels of a given patient, or of all patients
+        if no patient is given, in each day of the calendar.
+
+        Parameters:
+        ----------------------------------
+        id: int or None.
+            Patient id.
+
+        Returns:
+        ----------------------------------
+        days: pd.DatetimeIndex.
+            Days of the calendar.
+
+        medians: np.ndarray.
+            Hourly medians, array with shape (21, 24).
+
+        readings: np.ndarray.
+            Number of readings, including the missing ones, array with shape (21, 24).
+        '''
+
+        days = pd.date_range(start=self.calendar_start, periods=21, freq='D')
+
+        if id is None:
+            return days, self.population_medians[0], self.population_readings[0]
+
+        self.locate(id)
+        i = np.searchsorted(self.ids, id)
+
+        return days, self.calendar_medians[i], self.calendar_readings[i]
+
+    def describe(self, id=None, populations=None):
+        '''
+        Calculate the descriptive statistics of the readings of a given patient, or of all the patients in the given
+        populations, from the sufficient statistics, without scanning the readings.
+
+        Parameters:
+        ----------------------------------
+        id: int or None.
+            Patient id.
+
+        populations: list of str or None.
+            Populations, used if no patient is given. If None, all the populations are included.
+
+        Returns:
+        ----------------------------------
+        pd.Series.
+            Series with items 'device_worn (%)', 'extreme_hypo (%)', 'hypo (%)', 'in_range (%)', 'hyp (%)',
+            'extreme_hyp (%)', see "preprocess_data", 'bg (avg)', 'bg (std)' and 'bg (cv)', where the standard
+            deviation is the sample standard deviation.
+        '''
+
+        if id is not None:
+            self.locate(id)
+            statistics = self.statistics[np.searchsorted(self.ids, id)]
+
+        else:
+            statistics = self.cube.loc[populations if populations is not None else self.cube.index].values.sum(axis=0)
+
+        counts, total, squares = statistics[:MISSING + 1], statistics[MISSING + 1], statistics[MISSING + 2]
+        n = counts[:MISSING].sum()
+
+        data = range_percentages(counts[None, :]).iloc[0]
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            data['bg (avg)'] = total / n
+            data['bg (std)'] = np.sqrt(max(squares - total ** 2 / n, 0.) / (n - 1))
+            data['bg (cv)'] = data['bg (std)'] / data['bg (avg)']
+
+        return data
+
+    def index(self, window=None):
+        '''
+        Return the bitmap index of the patients' statistics over the most recent week, or over a given
+        time window, see "summary" and "PatientIndex". The index is built once for each time window and
+        rebuilt after updates.
+        '''
+
+        if window not in self._indexes:
+            self._indexes[window] = PatientIndex(self.summary(window))
+
+        return self._indexes[window]
+
+    def window_statistics(self, window, offset=0):
+        '''
+        Calculate the statistics of each patient over a time window ending a given number of days before
+        the most recent timestamp. The statistics are derived from the cumulative sums, without scanning
+        the readings.
+
+        Parameters:
+        ----------------------------------
+        window: float.
+            Length of the time window (in days).
+
+        offset: float.
+            Number of days between the end of the time window and the most recent timestamp.
+
+        Returns:
+        ----------------------------------
+        pd.DataFrame.
+            Data frame indexed by patient id, with column 'readings', the number of readings of each patient in the
+            time window, and columns 'device_worn (%)', 'extreme_hypo (%)', 'hypo (%)', 'in_range (%)', 'hyp (%)',
+            'extreme_hyp (%)' and 'bg (avg)', see "preprocess_data".
+        '''
+
+        # Define the time window, the readings after the start and up to the end are included.
+        freq = int(round(self.freq * 60 * 1e9))
+        end = self.ts.max().astype(np.int64) - int(offset * 24 * 60 * 60 * 1e9) if len(self.ts) else 0
+        start = end - int(window * 24 * 60 * 60 * 1e9)
+
+        # Find the positions of the first and last readings in the time window, the readings
+        # of each patient are spaced at the same frequency.
+        lengths = np.diff(self.offsets)
+        first = self.ts[np.minimum(self.offsets[:-1], len(self.ts) - 1)].astype(np.int64) if len(self.ts) else 0
+        lo = self.offsets[:-1] + np.clip((start - first) // freq + 1, 0, lengths)
+        hi = self.offsets[:-1] + np.clip((end - first) // freq + 1, 0, lengths)
+
+        # Count the readings in each glucose range in the time window.
+        counts = self.cumulative_counts[hi].astype(np.int64) - self.cumulative_counts[lo]
+        counts = np.c_[counts, hi - lo - counts.sum(axis=1)]
+
+        # Calculate the statistics.
+        data = range_percentages(counts).set_index(self.ids)
+        data.insert(0, 'readings', hi - lo)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            data['bg (avg)'] = (self.cumulative_bg[hi] - self.cumulative_bg[lo]) / counts[:, :MISSING].sum(axis=1)
+
+        return data
+
+    def summary(self, window=None):
+        '''
+        Return the statistics of each patient over the most recent week, or over a given time window, together
+        with the patient's attributes, one row per patient. Patients without readings in the time window are excluded.
+
+        Parameters:
+        ----------------------------------
+        window: float or None.
+            Length of the time window (in days). If None, the weekly statistics, ranks and priority groups
+            calculated by "preprocess_data" are returned. Otherwise, the statistics are calculated over the given
+            time window, and the patients are ranked and prioritized by comparing them with those over the
+            previous time window of the same length.
+
+        Returns:
+        ----------------------------------
+        pd.DataFrame.
+            Data frame with columns 'id', 'name', 'population', 'rank', 'review', 'device_worn (%)', 'extreme_hypo (%)',
+            'hypo (%)', 'in_range (%)', 'hyp (%)', 'extreme_hyp (%)' and 'bg (avg)'.
+        '''
+
+        if window is None:
+            data = self.weeks.xs(1., level='most_recent_week')
+            return self.patients.join(data, how='inner').reset_index(drop=False)
+
+        # Calculate the statistics over the time window and over the previous time window.
+        data = self.window_statistics(window)
+        data = data[data.pop('readings') > 0]
+        data['in_range_previous_week (%)'] = self.window_statistics(window, offset=window)['in_range (%)'].fillna(0.)
+
+        # Rank and prioritize the patients.
+        data['rank'] = rank_patients(data)
+        data['review'] = prioritize_patients(data)
+
+        data = data.drop(columns='in_range_previous_week (%)')
+        patients = self.patients[['name', 'population']]
+
+        return patients.join(data, how='inner').rename_axis('id').reset_index(drop=False)
+
+    def update(self, df):
+        '''
+        Update the store with a batch of newly arrived readings. Only the time series, weekly statistics and
+        priority groups of the patients whose data has changed are recomputed, and the ranks are recomputed only
+        if the time in range over the most recent week of any of these patients has changed. The weekly statistics
+        of all patients whose readings cross the most recent week boundary are recomputed as well when the new
+        readings move the most recent timestamp forward. Newly arrived readings take precedence over stored
+        readings falling in the same time slot. The histograms, calendar and sufficient statistics are rebuilt only
+        for the patients with new readings, and the cumulative sums only from their first reading onward.
+
+        Updates are meant for single-process use. On a store built by "from_arrays", e.g. memory-mapped from the
+        cache by "load_sample_store", the updated arrays are private copies in the calling process and nothing is
+        written back to the cache, so other processes mapping the same cache entry do not see the update and it
+        is lost on restart. With multiple workers, the store should be rebuilt from the updated input files instead.
+
+        Parameters:
+        ----------------------------------
+        df: pd.DataFrame.
+            Newly arrived readings, data frame with columns 'id', 'ts' and 'bg', see "preprocess_data".
+            All the patients must be present in the store.
+
+        Returns:
+        ----------------------------------
+        updated: np.ndarray.
+            Ids of the patients whose weekly statistics have been recomputed, empty if there are no new readings.
+        '''
+
+        # Leave the store unchanged if there are no new readings.
+        if df.empty:
+            return np.empty(0, dtype=self.ids.dtype)
+
+        # Parse the timestamps.
+        df = df[['id', 'ts', 'bg']].copy()
+        df['ts'] = pd.to_datetime(df['ts'])
+
+        # Check that all the patients are present in the store.
+        ids = np.unique(df['id'].values)
+        unknown = ids[~np.isin(ids, self.ids)]
+        if len(unknown):
+            raise KeyError(f'Unknown patient ids: {unknown.tolist()}')
+
+        # Extract the stored readings of the patients with new readings.
+        patients = np.repeat(self.ids, np.diff(self.offsets))
+        affected = np.isin(patients, ids)
+
+        # Resample the time series of these patients, with the new readings after the stored ones.
+        resampled = resample_data(pd.concat([
+            pd.DataFrame({'id': patients[affected], 'ts': self.ts[affected], 'bg': self.bg[affected]}),
+            df
+        ]), self.freq)
+
+        # Update the most recent week flags of the other patients.
+        end = max(self.ts.max(), resampled['ts'].values.max()) if len(self.ts) else resampled['ts'].values.max()
+        most_recent_week = end - self.ts[~affected] < np.timedelta64(7, 'D')
+
+        # Find the other patients whose flags have changed.
+        moved = np.unique(patients[~affected][most_recent_week != self.most_recent_week[~affected]])
+
+        # Keep the previous readings of the patients with new readings in the calendar.
+        removed = self.ts[affected], self.bg[affected]
+
+        # Splice the resampled time series into the readings arrays.
+        patients = np.concatenate([patients[~affected], resampled['id'].values])
+        order = np.argsort(patients, kind='stable')
+        self.ts = np.concatenate([self.ts[~affected], resampled['ts'].values])[order]
+        self.bg = np.concatenate([self.bg[~affected], resampled['bg'].values.astype(self.bg.dtype)])[order]
+        self.most_recent_week = np.concatenate([most_recent_week, end - resampled['ts'].values < np.timedelta64(7, 'D')])[order]
+        self.bg_range = np.concatenate([self.bg_range[~affected], classify_readings(resampled['bg'].values)])[order]
+
+        # Replace the counts of the readings of the patients with new readings in the offset table.
+        rows = np.searchsorted(self.ids, ids)
+        counts = np.diff(self.offsets)
+        counts[rows] = np.bincount(np.searchsorted(ids, resampled['id'].values), minlength=len(ids))
+        self.offsets = np.r_[0, np.cumsum(counts)]
+
+        # Rebuild the derived arrays of the patients with new readings, the readings before the first of them are unchanged.
+        self._cumulate(self.offsets[rows[0]])
+        self._statistics(rows)
+        self._histograms(rows)
+        self._calendar(rows, removed)
+
+        # Recalculate the weekly statistics of the updated patients.
+        updated = np.union1d(ids, moved)
+        stats = weekly_statistics(self._readings(np.isin(patients[order], updated)))
+        previous = self.weeks['in_range (%)']
+        self.weeks = pd.concat([
+            self.weeks.drop(index=updated, level='id', errors='ignore'),
+            stats.set_index(['id', 'most_recent_week'])
+        ]).sort_index()
+
+        # Reassign the priority groups of the updated patients.
+        data = ranking_data(stats)
+        self.patients.loc[data['id'].values, 'review'] = prioritize_patients(data).values
+
+        # Rerank the patients if the time in range over the most recent week has changed.
+        index = pd.MultiIndex.from_product([updated, [1.]])
+        if not previous.reindex(index).equals(self.weeks['in_range (%)'].reindex(index)):
+            data = ranking_data(self.weeks.reset_index(drop=False))
+            self.patients.loc[data['id'].values, 'rank'] = rank_patients(data).values
+
+        self._indexes = {}
+        self.version += 1
+
+        return updated
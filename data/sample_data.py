@@ -1,38 +1,89 @@
 import pandas as pd
 
 from algorithm.rank_patients import preprocess_data
+from data.compact_data import compact_data
+from data.stream_data import stream_data
+from data.cache_data import cache_key, save_cache, load_cache
+from data.patient_store import PatientStore
 from simulations.simulate_patients import simulate_patients
 from simulations.simulate_populations import simulate_populations
 
-def load_sample_data():
+def load_sample_data(compact=False, days=None, chunksize=100000, n_jobs=1, cache='data/cache'):
     
-    # Load the patients' dataset.
-    patients = pd.read_csv('data/patients.csv', parse_dates=['ts'])
+    # Load the preprocessed dataset from the cache, if it is up to date.
+    if cache is not None:
+        key = cache_key(['data/patients.csv', 'data/populations.csv'], cache, compact=compact, days=days)
+        tables, _ = load_cache(cache, key)
+        
+        if tables is not None:
+            return tables['readings'], tables['weeks'], tables['patients']
+    
+    # Load the patients' dataset in chunks, keeping only the readings in the analysis window.
+    patients = stream_data('data/patients.csv', days=days, chunksize=chunksize)
     
     # Preprocess the patients' dataset.
-    patients = preprocess_data(patients)
+    readings, weeks, patients = preprocess_data(patients, n_jobs=n_jobs)
 
     # Load the patients' populations.
     populations = pd.read_csv('data/populations.csv')
     
-    # Add the patient's populations to the patients' dataset.
-    df = populations.set_index('id').join(patients.set_index('id'))
+    # Add the patient's populations to the patients' table.
+    patients = populations.set_index('id').join(patients.set_index('id')).reset_index(drop=False)
+    
+    # Keep only the readings and weekly statistics of the patients in the patients' table.
+    readings = readings[readings['id'].isin(patients['id'])].reset_index(drop=True)
+    weeks = weeks[weeks['id'].isin(patients['id'])].reset_index(drop=True)
+    
+    # Convert the readings to compact dtypes.
+    if compact:
+        readings = compact_data(readings)
     
-    return df.reset_index(drop=False)
+    # Save the preprocessed dataset to the cache.
+    if cache is not None:
+        save_cache(cache, key, {'readings': readings, 'weeks': weeks, 'patients': patients})
+    
+    return readings, weeks, patients
 
 
-def generate_random_data(num=50, freq=5, populations=['4T', 'Pilot', 'Pilot Cont', 'TIPs']):
+def load_sample_store(compact=True, days=None, chunksize=100000, n_jobs=1, cache='data/cache', mmap_mode='r'):
+    
+    # Load the patients' store from the cache, if it is up to date. The readings arrays are memory-mapped,
+    # so that they are shared by all the processes on the same host rather than copied into each of them.
+    key = cache_key(['data/patients.csv', 'data/populations.csv'], cache, compact=compact, days=days, store=True)
+    tables, arrays = load_cache(cache, key, mmap_mode=mmap_mode)
+    
+    if tables is None:
+        
+        # Build the patients' store, without caching the readings table as well.
+        store = PatientStore(*load_sample_data(compact=compact, days=days, chunksize=chunksize, n_jobs=n_jobs, cache=None))
+        
+        # Save the patients' store to the cache and load it back.
+        save_cache(cache, key, *store.to_arrays())
+        tables, arrays = load_cache(cache, key, mmap_mode=mmap_mode)
+    
+    return PatientStore.from_arrays(tables, arrays)
+
+
+def generate_random_data(num=50, freq=5, populations=['4T', 'Pilot', 'Pilot Cont', 'TIPs'], compact=False):
     
     # Generate the patients' dataset.
     patients = simulate_patients(freq, num)
     
     # Preprocess the patients' dataset.
-    patients = preprocess_data(patients)
+    readings, weeks, patients = preprocess_data(patients)
     
     # Generate the patients' populations.
     populations = simulate_populations(num, populations)
     
-    # Add the patient's populations to the patients' dataset.
-    df = populations.set_index('id').join(patients.set_index('id'))
+    # Add the patient's populations to the patients' table.
+    patients = populations.set_index('id').join(patients.set_index('id')).reset_index(drop=False)
+    
+    # Keep only the readings and weekly statistics of the patients in the patients' table.
+    readings = readings[readings['id'].isin(patients['id'])].reset_index(drop=True)
+    weeks = weeks[weeks['id'].isin(patients['id'])].reset_index(drop=True)
+    
+    # Convert the readings to compact dtypes.
+    if compact:
+        readings = compact_data(readings)
     
-    return df.reset_index(drop=False)
+    return readings, weeks, patients
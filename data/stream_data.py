@@ -0,0 +1,70 @@
+import pandas as pd
+
+def stream_data(path, days=None, chunksize=100000):
+    '''
+    Read the patients' time series dataset from a CSV file in chunks of a bounded size, dropping
+    the readings outside the analysis window as soon as they are read. The analysis window covers
+    the last given number of days before the most recent reading. As the most recent reading seen
+    so far can only move forward, a reading which falls outside the window of a chunk also falls
+    outside the final window, so the peak memory is bounded by the retained window and by one chunk,
+    rather than by the size of the file.
+
+    Parameters:
+    ----------------------------------
+    path: str.
+        Path to the CSV file, with columns 'id', 'ts' and 'bg'.
+
+    days: int, float or None.
+        Length of the analysis window (in days). If None, all the readings are retained.
+
+    chunksize: int.
+        Number of rows read in each chunk.
+
+    Returns:
+    ----------------------------------
+    pd.DataFrame.
+        Patients' time series dataset, restricted to the analysis window.
+        Data frame with the following columns:
+
+        'id': int.
+            Patient id.
+
+        'ts': pd.datetime.
+            Timestamp.
+
+        'bg': float.
+            Blood glucose level.
+    '''
+
+    chunks = []
+    buffered = 0
+    retained = 0
+    latest = None
+
+    for chunk in pd.read_csv(path, chunksize=chunksize, parse_dates=['ts']):
+
+        if days is not None and len(chunk):
+
+            # Update the most recent timestamp seen so far.
+            latest = chunk['ts'].max() if latest is None else max(latest, chunk['ts'].max())
+            cutoff = latest - pd.Timedelta(days=days)
+
+            # Drop the readings of the chunk outside the window.
+            chunk = chunk[chunk['ts'] >= cutoff]
+
+        chunks.append(chunk)
+        buffered += len(chunk)
+
+        # Drop the buffered readings which have moved outside the window, once the buffer has doubled.
+        if days is not None and buffered > 2 * max(retained, chunksize):
+            df = pd.concat(chunks, ignore_index=True)
+            chunks = [df[df['ts'] >= cutoff]]
+            buffered = retained = len(chunks[0])
+
+    df = pd.concat(chunks, ignore_index=True)
+
+    # Drop the readings outside the final window.
+    if days is not None and len(df):
+        df = df[df['ts'] >= latest - pd.Timedelta(days=days)].reset_index(drop=True)
+
+    return df
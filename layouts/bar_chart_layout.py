@@ -34,6 +34,33 @@ def bar_chart_layout(populations):
                         className='checklist-container'
                     ),
                 
+                    # Time window.
+                    html.Div(
+                        children=[
+                        
+                            html.P(
+                                children=['Period'],
+                                className='checklist-title'
+                            ),
+                        
+                            dcc.RadioItems(
+                                id='window-radio',
+                                options=[
+                                    {'value': 1, 'label': 'Last 24 Hours'},
+                                    {'value': 7, 'label': 'Last 7 Days'},
+                                    {'value': 14, 'label': 'Last 14 Days'},
+                                    {'value': 30, 'label': 'Last 30 Days'},
+                                    {'value': 90, 'label': 'Last 90 Days'},
+                                ],
+                                value=7,
+                                inputClassName='checklist-input',
+                                labelClassName='checklist-label'
+                            ),
+                    
+                        ],
+                        className='checklist-container'
+                    ),
+                
                     # Time worn.
                     html.Div(
                         children=[
@@ -147,6 +174,81 @@ def bar_chart_layout(populations):
                     'padding': '0'
                 }
             ),
+
+            # Sorting and pagination.
+            html.Div(
+                children=[
+                
+                    html.Span(
+                        children='Sort by',
+                        className='checklist-title'
+                    ),
+                
+                    dcc.Dropdown(
+                        id='sort-dropdown',
+                        options=[
+                            {'value': 'priority', 'label': 'Priority'},
+                            {'value': 'device_worn (%)', 'label': '% Time Worn'},
+                            {'value': 'bg (avg)', 'label': 'Avg. Glucose'},
+                            {'value': 'in_range (%)', 'label': '% Time in Range'},
+                            {'value': 'hypo (%)', 'label': '% Time Below 70'},
+                            {'value': 'extreme_hypo (%)', 'label': '% Time Below 54'},
+                        ],
+                        value='priority',
+                        clearable=False,
+                        searchable=False,
+                        style={'width': '10vw'}
+                    ),
+                
+                    html.Span(
+                        children='Per page',
+                        className='checklist-title'
+                    ),
+                
+                    dcc.Dropdown(
+                        id='page-size-dropdown',
+                        options=[
+                            {'value': 25, 'label': '25'},
+                            {'value': 50, 'label': '50'},
+                            {'value': 100, 'label': '100'},
+                            {'value': 0, 'label': 'All'},
+                        ],
+                        value=50,
+                        clearable=False,
+                        searchable=False,
+                        style={'width': '5vw'}
+                    ),
+                
+                    html.Button(
+                        children='Previous',
+                        id='previous-page-button',
+                        n_clicks=0
+                    ),
+                
+                    html.Span(
+                        id='page-description'
+                    ),
+                
+                    html.Button(
+                        children='Next',
+                        id='next-page-button',
+                        n_clicks=0
+                    ),
+                
+                    # Current page number, starting from 0.
+                    dcc.Store(
+                        id='bar-chart-page',
+                        data=0
+                    ),
+                
+                ],
+                style={
+                    'display': 'flex',
+                    'align-items': 'center',
+                    'gap': '1vw',
+                    'margin': '0.5vw 0vw 0.5vw 0vw'
+                }
+            ),
     
             # Graph.
             html.Div(
@@ -169,6 +271,18 @@ def bar_chart_layout(populations):
                             'padding': '0'
                         }
                     ),
+                    
+                    # Bar chart figure, before highlighting the selected patient.
+                    dcc.Store(
+                        id='bar-chart-figure',
+                        data=empty_chart
+                    ),
+                    
+                    # Id of the selected patient, None if no patient is selected.
+                    dcc.Store(
+                        id='selected-patient',
+                        data=None
+                    ),
     
                 ],
                 style={
@@ -0,0 +1,42 @@
+import dash_core_components as dcc
+import dash_html_components as html
+
+from visualizations.empty_chart import empty_chart
+from layouts.calendar_chart_layout import first_row
+
+# Graph with the 3 weeks.
+second_row = [html.Tr(
+    children=[
+
+        html.Div(
+            children=dcc.Graph(
+                id='calendar-grid-chart',
+                figure=empty_chart,
+                config={
+                    'responsive': True,
+                    'autosizable': True,
+                    'displayModeBar': False,
+                },
+                style={
+                    'display': 'block',
+                    'width': '100%',
+                    'height': '100%',
+                    'margin': '0',
+                    'padding': '0'
+                }
+            ),
+            className='calendar-grid',
+        ),
+
+    ],
+)]
+
+# Full table.
+calendar_grid_chart_layout = html.Table(
+    children=first_row + second_row,
+    style={
+        'margin': '1vw 0vw 0.5vw 0vw',
+        'padding': '0',
+        'display': 'block'
+    }
+)
@@ -2,16 +2,19 @@ import numpy as np
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 
-def bar_chart(data):
+# Metrics displayed in each column, with the condition for highlighting the bars in red.
+COLUMNS = [
+    ('device_worn (%)', lambda x: x < 0.75),
+    ('bg (avg)', lambda x: x < 54),
+    ('in_range (%)', lambda x: x < 0.65),
+    ('hypo (%)', lambda x: x > 0.04),
+    ('extreme_hypo (%)', lambda x: x > 0.01),
+]
+
+def bar_chart_template():
     '''
-    Generate the bar chart.
-    
-    Parameters:
-    ----------------------------------
-    data: pd.DataFrame.
-        Data frame with average blood glucose level, percentage of time worn, percentage of time in range,
-        percentage of time in hypo and percentage of time in extreme hypo over the last 7 days.
-    
+    Generate the bar chart template, the figure dictionary without the data.
+
     Returns:
     ----------------------------------
     dict.
@@ -37,25 +40,18 @@ def bar_chart(data):
         )
     )
 
-    # Define the tooltip text.
+    # Define the tooltip text, the metrics are passed as custom data after the patient id.
     hovertemplate = \
-        '<b>% Time Worn: </b>' + data['device_worn (%)'].apply(lambda x: format(x, '.0%')) + '<br>' + \
-        '<b>Avg. Glucose (mg/dL): </b>' + data['bg (avg)'].apply(lambda x: format(x, '.0f')) + '<br>' + \
-        '<b>% Time in Range: </b>' + data['in_range (%)'].apply(lambda x: format(x, '.0%')) + '<br>' + \
-        '<b>% Time Below 70: </b>' + data['hypo (%)'].apply(lambda x: format(x, '.1%')) + '<br>' + \
-        '<b>% Time Below 54: </b>' + data['extreme_hypo (%)'].apply(lambda x: format(x, '.1%')) + '<extra></extra>'
-
-    # Define the colorscale.
-    blue = 'rgba(31, 119, 180, 0.9)'
-    red = 'rgba(214, 39, 40, 0.9)'
+        '<b>% Time Worn: </b>%{customdata[1]:.0%}<br>' + \
+        '<b>Avg. Glucose (mg/dL): </b>%{customdata[2]:.0f}<br>' + \
+        '<b>% Time in Range: </b>%{customdata[3]:.0%}<br>' + \
+        '<b>% Time Below 70: </b>%{customdata[4]:.1%}<br>' + \
+        '<b>% Time Below 54: </b>%{customdata[5]:.1%}<extra></extra>'
 
     # Add the first bar chart in the first column.
     fig.add_trace(
         trace=go.Bar(
-            y=[data['review'], data['name']],
-            x=data['device_worn (%)'],
-            customdata=data['id'],
-            text=data['device_worn (%)'].apply(lambda x: format(x, '.0%')),
+            texttemplate='%{x:.0%}',
             textposition='outside',
             textfont=dict(
                 family='Arial',
@@ -64,7 +60,6 @@ def bar_chart(data):
             ),
             orientation='h',
             marker=dict(
-                color=np.where(data['device_worn (%)'] < 0.75, red, blue),
                 line=dict(width=0)
             ),
             width=0.8,
@@ -78,10 +73,7 @@ def bar_chart(data):
     # Add the second bar chart in the second column.
     fig.add_trace(
         trace=go.Bar(
-            y=[data['review'], data['name']],
-            x=data['bg (avg)'],
-            customdata=data['id'],
-            text=data['bg (avg)'].apply(lambda x: format(x, ',.0f')),
+            texttemplate='%{x:,.0f}',
             textposition='outside',
             textfont=dict(
                 family='Arial',
@@ -90,7 +82,6 @@ def bar_chart(data):
             ),
             orientation='h',
             marker=dict(
-                color=np.where(data['bg (avg)'] < 54, red, blue),
                 line=dict(width=0)
             ),
             width=0.8,
@@ -104,10 +95,7 @@ def bar_chart(data):
     # Add the third bar chart in the third column.
     fig.add_trace(
         trace=go.Bar(
-            y=[data['review'], data['name']],
-            x=data['in_range (%)'],
-            customdata=data['id'],
-            text=data['in_range (%)'].apply(lambda x: format(x, '.0%')),
+            texttemplate='%{x:.0%}',
             textposition='outside',
             textfont=dict(
                 family='Arial',
@@ -116,7 +104,6 @@ def bar_chart(data):
             ),
             orientation='h',
             marker=dict(
-                color=np.where(data['in_range (%)'] < 0.65, red, blue),
                 line=dict(width=0)
             ),
             width=0.8,
@@ -130,10 +117,7 @@ def bar_chart(data):
     # Add the fourth bar chart in the fourth column.
     fig.add_trace(
         trace=go.Bar(
-            y=[data['review'], data['name']],
-            x=data['hypo (%)'],
-            customdata=data['id'],
-            text=data['hypo (%)'].apply(lambda x: format(x, '.1%')),
+            texttemplate='%{x:.1%}',
             textposition='outside',
             textfont=dict(
                 family='Arial',
@@ -142,7 +126,6 @@ def bar_chart(data):
             ),
             orientation='h',
             marker=dict(
-                color=np.where(data['hypo (%)'] > 0.04, red, blue),
                 line=dict(width=0)
             ),
             width=0.8,
@@ -156,10 +139,7 @@ def bar_chart(data):
     # Add the fifth bar chart in the fifth column.
     fig.add_trace(
         trace=go.Bar(
-            y=[data['review'], data['name']],
-            x=data['extreme_hypo (%)'],
-            customdata=data['id'],
-            text=data['extreme_hypo (%)'].apply(lambda x: format(x, '.1%')),
+            texttemplate='%{x:.1%}',
             textposition='outside',
             textfont=dict(
                 family='Arial',
@@ -168,7 +148,6 @@ def bar_chart(data):
             ),
             orientation='h',
             marker=dict(
-                color=np.where(data['extreme_hypo (%)'] > 0.01, red, blue),
                 line=dict(width=0)
             ),
             width=0.8,
@@ -195,7 +174,6 @@ def bar_chart(data):
             color='#55514b'
         ),
         xaxis=dict(
-            range=[0, data['device_worn (%)'].max() + 0.2],
             fixedrange=True,
             tickmode='array',
             tickvals=[0, 0.25, 0.5, 0.75, 1],
@@ -222,7 +200,6 @@ def bar_chart(data):
             side='top'
         ),
         xaxis2=dict(
-            range=[0, data['bg (avg)'].max() + 30],
             fixedrange=True,
             tickformat=',.0f',
             tickangle=0,
@@ -247,7 +224,6 @@ def bar_chart(data):
             side='top'
         ),
         xaxis3=dict(
-            range=[0, data['in_range (%)'].max() + 0.2],
             fixedrange=True,
             tickmode='array',
             tickvals=[0, 0.25, 0.5, 0.75, 1],
@@ -274,7 +250,6 @@ def bar_chart(data):
             side='top'
         ),
         xaxis4=dict(
-            range=[0, np.min([data['hypo (%)'].max() + 0.1, 1])],
             fixedrange=True,
             tickformat='.0%',
             tickangle=0,
@@ -299,7 +274,6 @@ def bar_chart(data):
             side='top'
         ),
         xaxis5=dict(
-            range=[0, np.min([data['extreme_hypo (%)'].max() + 0.1, 1])],
             fixedrange=True,
             tickformat='.0%',
             tickangle=0,
@@ -342,3 +316,72 @@ def bar_chart(data):
     )
 
     return fig.to_dict()
+
+
+# Build the template once, the figures only differ in their data.
+TEMPLATE = bar_chart_template()
+
+def bar_chart(data, group=True):
+    '''
+    Generate the bar chart, by filling the data into the bar chart template.
+    
+    Parameters:
+    ----------------------------------
+    data: pd.DataFrame.
+        Data frame with average blood glucose level, percentage of time worn, percentage of time in range,
+        percentage of time in hypo and percentage of time in extreme hypo over the last 7 days, one row per
+        patient from the top to the bottom of the chart.
+
+    group: bool.
+        True if the patients are grouped by priority group on the y-axis, False if they are only labelled
+        by name and id, e.g. when they are not sorted by priority group.
+    
+    Returns:
+    ----------------------------------
+    dict.
+        Figure dictionary.
+    '''
+
+    # Define the colorscale.
+    blue = 'rgba(31, 119, 180, 0.9)'
+    red = 'rgba(214, 39, 40, 0.9)'
+
+    # Copy the parts of the template which are filled in, the other parts are shared.
+    layout = dict(TEMPLATE['layout'])
+    fig = dict(TEMPLATE, layout=layout, data=[])
+
+    # Plot the first patient at the top, the y-axis is drawn from the bottom up.
+    data = data.iloc[::-1]
+
+    # Pass the patient id and the metrics as custom data, which are formatted in the browser.
+    customdata = data[['id'] + [column for column, _ in COLUMNS]].values.astype(float)
+
+    # Fill in the bars of each column.
+    if group:
+        y = [data['review'].values, data['name'].values]
+
+    else:
+        y = (data['name'] + ' (' + data['id'].astype(str) + ')').values
+        layout['yaxis'] = dict(layout['yaxis'], type='category')
+
+    for trace, (column, highlight) in zip(TEMPLATE['data'], COLUMNS):
+        fig['data'].append(dict(
+            trace,
+            y=y,
+            x=data[column].values,
+            customdata=customdata,
+            marker=dict(trace['marker'], color=np.where(highlight(data[column]), red, blue)),
+        ))
+
+    # Fill in the ranges of the x-axes.
+    ranges = [
+        data['device_worn (%)'].max() + 0.2,
+        data['bg (avg)'].max() + 30,
+        data['in_range (%)'].max() + 0.2,
+        np.min([data['hypo (%)'].max() + 0.1, 1]),
+        np.min([data['extreme_hypo (%)'].max() + 0.1, 1]),
+    ]
+    for axis, range_ in zip(['xaxis', 'xaxis2', 'xaxis3', 'xaxis4', 'xaxis5'], ranges):
+        layout[axis] = dict(layout[axis], range=[0, range_])
+
+    return fig
@@ -1,24 +1,19 @@
+import numpy as np
 import plotly.graph_objects as go
 
-def calendar_chart(data):
+def calendar_chart_template():
     '''
-    Generate the calendar chart.
-
-    Parameters:
-    ----------------------------------
-    data: pd.DataFrame.
-       Data frame with blood glucose level hourly medians on a given day out of the last 14 days.
+    Generate the calendar chart template, the figure dictionary without the data.
 
     Returns:
     ----------------------------------
-    go.Figure.
-        Figure object.
+    dict.
+        Figure dictionary.
     '''
     
     # Define the figure layout.
     layout = dict(
         title=dict(
-            text=data['day'].astype(str).iloc[0],
             font=dict(
                 family='Arial Black'
             ),
@@ -75,8 +70,6 @@ def calendar_chart(data):
     # Add the lower bound of the target range.
     traces.append(
         go.Scatter(
-            x=data['hour'],
-            y=[70] * data.shape[0],
             mode='lines',
             showlegend=False,
             line=dict(
@@ -91,8 +84,6 @@ def calendar_chart(data):
     # Add the upper bound of the target range.
     traces.append(
         go.Scatter(
-            x=data['hour'],
-            y=[180] * data.shape[0],
             mode='lines',
             showlegend=False,
             line=dict(
@@ -109,9 +100,6 @@ def calendar_chart(data):
     # Add the median.
     traces.append(
         go.Scatter(
-            x=data['hour'],
-            y=data['bg'],
-            text=data['day'],
             mode='lines',
             name='50% - Median',
             showlegend=True,
@@ -124,4 +112,37 @@ def calendar_chart(data):
         )
     )
 
-    return go.Figure(data=traces, layout=layout)
+    return go.Figure(data=traces, layout=layout).to_dict()
+
+
+# Build the template once, the figures only differ in their data.
+TEMPLATE = calendar_chart_template()
+
+def calendar_chart(data):
+    '''
+    Generate the calendar chart, by filling the data into the calendar chart template.
+
+    Parameters:
+    ----------------------------------
+    data: pd.DataFrame.
+       Data frame with blood glucose level hourly medians on a given day out of the last 14 days.
+
+    Returns:
+    ----------------------------------
+    dict.
+        Figure dictionary.
+    '''
+
+    # Define the lines, the bounds of the target range and the median.
+    x = data['hour'].values
+    lines = [np.full(len(data), 70), np.full(len(data), 180), data['bg'].values]
+
+    # Fill in the lines.
+    fig = dict(TEMPLATE, data=[dict(trace, x=x, y=y) for trace, y in zip(TEMPLATE['data'], lines)])
+    fig['data'][-1]['text'] = data['day'].values
+
+    # Fill in the title.
+    title = TEMPLATE['layout']['title']
+    fig['layout'] = dict(TEMPLATE['layout'], title=dict(title, text=data['day'].astype(str).iloc[0]))
+
+    return fig
@@ -0,0 +1,206 @@
+import numpy as np
+import plotly.graph_objects as go
+
+# Number of weeks (rows) and days (columns) in the grid.
+WEEKS = 3
+DAYS = 7
+
+# Width of each day on the x-axis of its week, including the gap between consecutive days.
+STEP = 26
+
+# Hours with a tick label in each day.
+TICKS = [0, 4, 8, 12, 16, 20]
+
+def calendar_grid_chart_template():
+    '''
+    Generate the calendar grid chart template, the figure dictionary without the data.
+
+    The 3 weeks are drawn in a single figure, with one pair of axes for each week. The days of a week
+    are placed side by side on the x-axis of the week, offset by "STEP" hours, so that each week only
+    needs one line trace, and the target range and the borders of each day are drawn as shapes.
+
+    Returns:
+    ----------------------------------
+    dict.
+        Figure dictionary.
+    '''
+
+    # Define the figure layout.
+    layout = dict(
+        plot_bgcolor='white',
+        paper_bgcolor='white',
+        showlegend=False,
+        margin=dict(t=0, r=5, b=0, l=5, pad=0),
+        font=dict(
+            family='Arial',
+            size=6,
+            color='#55514b'
+        ),
+        shapes=[],
+        annotations=[],
+    )
+
+    # Define the tooltip layout.
+    hoverlabel = dict(
+        bgcolor='white',
+        bordercolor='#aca899',
+        font=dict(
+            family='Arial',
+            size=10,
+            color='#55514b'
+        )
+    )
+
+    # Add the data to the figure.
+    traces = []
+
+    for week in range(WEEKS):
+
+        # Define the axes of the week, leaving space for the day titles above and the hour ticks below.
+        suffix = str(week + 1) if week > 0 else ''
+        top = 1 - week / WEEKS
+        bottom = 1 - (week + 1) / WEEKS
+
+        layout['xaxis' + suffix] = dict(
+            anchor='y' + suffix,
+            domain=[0, 1],
+            range=[-0.5, DAYS * STEP - STEP + 23.5],
+            fixedrange=True,
+            tickmode='array',
+            tickvals=[day * STEP + hour for day in range(DAYS) for hour in TICKS],
+            ticktext=[f'{(hour - 1) % 12 + 1:02d} {"AM" if hour < 12 else "PM"}' for day in range(DAYS) for hour in TICKS],
+            tickangle=-45,
+            tickfont=dict(
+                family='Arial',
+                size=6,
+                color='#55514b'
+            ),
+            color='#55514b',
+            showline=False,
+            showgrid=False,
+            zeroline=False,
+        )
+
+        layout['yaxis' + suffix] = dict(
+            anchor='x' + suffix,
+            domain=[bottom + 0.1 / WEEKS, top - 0.17 / WEEKS],
+            range=[0, 400],
+            fixedrange=True,
+            showticklabels=False,
+            showline=False,
+            showgrid=False,
+            zeroline=False,
+        )
+
+        for day in range(DAYS):
+
+            # Add the target range and the border of the day.
+            x0 = day * STEP - 0.5
+            x1 = day * STEP + 23.5
+
+            layout['shapes'].append(dict(
+                type='rect',
+                xref='x' + suffix,
+                yref='y' + suffix,
+                x0=x0,
+                x1=x1,
+                y0=70,
+                y1=180,
+                fillcolor='rgba(207, 207, 207, 0.8)',
+                line=dict(width=0),
+                layer='below'
+            ))
+
+            layout['shapes'].append(dict(
+                type='rect',
+                xref='x' + suffix,
+                yref='y' + suffix,
+                x0=x0,
+                x1=x1,
+                y0=0,
+                y1=400,
+                line=dict(color='#aca899', width=1),
+            ))
+
+            # Add the title of the day.
+            layout['annotations'].append(dict(
+                xref='x' + suffix,
+                yref='y' + suffix,
+                x=day * STEP + 11.5,
+                y=400,
+                yanchor='bottom',
+                showarrow=False,
+                font=dict(
+                    family='Arial Black',
+                    size=8,
+                    color='#55514b'
+                ),
+            ))
+
+        # Add the median of the week.
+        traces.append(
+            go.Scatter(
+                mode='lines',
+                name='50% - Median',
+                xaxis='x' + suffix,
+                yaxis='y' + suffix,
+                line=dict(
+                    color='#FF7F0E',
+                    width=1.5
+                ),
+                hoverlabel=hoverlabel,
+                hovertemplate='<b>Day: </b>%{text}<br><b>Hour: </b>%{customdata}<br><b>50% - Median: </b>%{y: ,.2f}<extra></extra>'
+            )
+        )
+
+    return go.Figure(data=traces, layout=layout).to_dict()
+
+
+# Build the template once, the figures only differ in their data.
+TEMPLATE = calendar_grid_chart_template()
+
+def calendar_grid_chart(days, hours, medians, present):
+    '''
+    Generate the calendar grid chart, by filling the data into the calendar grid chart template.
+
+    Parameters:
+    ----------------------------------
+    days: np.ndarray.
+        Day of the month of each of the last 21 days, starting from a Monday.
+
+    hours: np.ndarray.
+        Label of each of the 24 hours.
+
+    medians: np.ndarray.
+        Blood glucose level hourly medians in each of the last 21 days, with shape (21, 24).
+
+    present: np.ndarray.
+        True if a day has a median in a given hour, with shape (21, 24). The days with less than two hours
+        are left empty.
+
+    Returns:
+    ----------------------------------
+    dict.
+        Figure dictionary.
+    '''
+
+    # Fill in the median of each week, breaking the line between consecutive days.
+    fig = dict(TEMPLATE, data=[])
+    for week, trace in enumerate(TEMPLATE['data']):
+        x, y, text, customdata = [], [], [], []
+        for day in range(week * DAYS, (week + 1) * DAYS):
+            if present[day].sum() > 1:
+                x.extend((day % DAYS) * STEP + np.flatnonzero(present[day]))
+                y.extend(medians[day][present[day]])
+                text.extend([days[day]] * present[day].sum())
+                customdata.extend(hours[present[day]])
+                x.append(None)
+                y.append(None)
+                text.append(None)
+                customdata.append(None)
+        fig['data'].append(dict(trace, x=x, y=y, text=text, customdata=customdata))
+
+    # Fill in the titles of the days.
+    fig['layout'] = dict(TEMPLATE['layout'], annotations=[dict(annotation, text=str(day)) for annotation, day in zip(TEMPLATE['layout']['annotations'], days)])
+
+    return fig
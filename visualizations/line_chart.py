@@ -1,18 +1,14 @@
+import numpy as np
 import plotly.graph_objects as go
 
-def line_chart(data):
+def line_chart_template():
     '''
-    Generate the line chart.
-    
-    Parameters:
-    ----------------------------------
-    data: pd.DataFrame.
-        Data frame with blood glucose level hourly percentiles over the last 14 days.
+    Generate the line chart template, the figure dictionary without the data.
 
     Returns:
     ----------------------------------
-    go.Figure.
-        Figure object.
+    dict.
+        Figure dictionary.
     '''
  
     # Define the figure layout.
@@ -83,8 +79,6 @@ def line_chart(data):
     # Add the lower bound of the target range.
     traces.append(
         go.Scatter(
-            x=data['hour'],
-            y=[70] * data.shape[0],
             mode='lines',
             showlegend=False,
             line=dict(
@@ -99,8 +93,6 @@ def line_chart(data):
     # Add the upper bound of the target range.
     traces.append(
         go.Scatter(
-            x=data['hour'],
-            y=[180] * data.shape[0],
             mode='lines',
             showlegend=False,
             line=dict(
@@ -117,8 +109,6 @@ def line_chart(data):
     # Add the 10th percentile.
     traces.append(
         go.Scatter(
-            x=data['hour'],
-            y=data['10%'],
             mode='lines',
             name='10%',
             showlegend=True,
@@ -134,8 +124,6 @@ def line_chart(data):
     # Add the 25th percentile.
     traces.append(
         go.Scatter(
-            x=data['hour'],
-            y=data['25% - IQR'],
             mode='lines',
             name='25% - IQR',
             showlegend=True,
@@ -151,8 +139,6 @@ def line_chart(data):
     # Add the 50th percentile.
     traces.append(
         go.Scatter(
-            x=data['hour'],
-            y=data['50% - Median'],
             mode='lines',
             name='50% - Median',
             showlegend=True,
@@ -168,8 +154,6 @@ def line_chart(data):
     # Add the 75th percentile.
     traces.append(
         go.Scatter(
-            x=data['hour'],
-            y=data['75% - IQR'],
             mode='lines',
             name='75% - IQR',
             showlegend=True,
@@ -185,8 +169,6 @@ def line_chart(data):
     # Add the 90th percentile.
     traces.append(
         go.Scatter(
-            x=data['hour'],
-            y=data['90%'],
             mode='lines',
             name='90%',
             showlegend=True,
@@ -199,4 +181,30 @@ def line_chart(data):
         )
     )
 
-    return go.Figure(data=traces, layout=layout)
+    return go.Figure(data=traces, layout=layout).to_dict()
+
+
+# Build the template once, the figures only differ in their data.
+TEMPLATE = line_chart_template()
+
+def line_chart(data):
+    '''
+    Generate the line chart, by filling the data into the line chart template.
+    
+    Parameters:
+    ----------------------------------
+    data: pd.DataFrame.
+        Data frame with blood glucose level hourly percentiles over the last 14 days.
+
+    Returns:
+    ----------------------------------
+    dict.
+        Figure dictionary.
+    '''
+
+    # Define the lines, the bounds of the target range and the percentiles.
+    x = data['hour'].values
+    lines = [np.full(len(data), 70), np.full(len(data), 180)] + [data[x].values for x in ['10%', '25% - IQR', '50% - Median', '75% - IQR', '90%']]
+
+    # Fill in the lines.
+    return dict(TEMPLATE, data=[dict(trace, x=x, y=y) for trace, y in zip(TEMPLATE['data'], lines)])